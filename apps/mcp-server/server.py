@@ -6,17 +6,31 @@ Provides Claude with grounded access to Indonesian legislation through 4 tools:
 - get_law_status: Check if a law is still in force
 - list_laws: Browse available regulations
 """
+import asyncio
+import functools
 import logging
 import os
+import random
 import re
 import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
+import httpx
+import orjson
 from dotenv import load_dotenv
 from fastmcp import FastMCP
-from supabase import create_client
+from supabase import AsyncClient, AsyncClientOptions
 
-load_dotenv()
+# Local dev only — .env is dockerignored, and Railway injects env vars directly.
+# An explicit path skips find_dotenv()'s directory walk.
+_ENV_FILE = Path(__file__).with_name(".env")
+if _ENV_FILE.is_file():
+    load_dotenv(_ENV_FILE)
 
 logging.basicConfig(
     format="%(asctime)s %(levelname)s %(message)s",
@@ -29,17 +43,30 @@ DISCLAIMER = (
     "Database Pasal.id saat ini mencakup sebagian kecil peraturan Indonesia."
 )
 
-STATUS_EXPLANATIONS: dict[str, str] = {
+STATUS_EXPLANATIONS: Mapping[str, str] = MappingProxyType({
     "berlaku": "This law is currently in force.",
     "diubah": "This law has been partially amended. Most provisions remain in force unless specifically changed.",
     "dicabut": "This law has been revoked and is no longer in force.",
     "tidak_berlaku": "This law is no longer effective.",
-}
+})
+
+PASAL_MAX_CHARS = 3000
+
+
+@asynccontextmanager
+async def _lifespan(_server: FastMCP):
+    """Warm the regulation type maps and law count once at startup instead of on the first tool call."""
+    try:
+        await _bootstrap()
+    except Exception as e:
+        # Not fatal — both loaders retry lazily on the first tool call
+        logger.warning("startup preload failed: %s", e)
+    yield
 
-AMENDMENT_REL_CODES = frozenset({"mengubah", "diubah_oleh", "mencabut", "dicabut_oleh"})
 
 mcp = FastMCP(
     "Pasal.id — Indonesian Legal Database",
+    lifespan=_lifespan,
     instructions=(
         "Search, read, and analyze Indonesian laws and regulations. "
         "Provides grounded legal information with exact article citations "
@@ -75,92 +102,232 @@ if not _supabase_key:
         "SUPABASE_ANON_KEY is required. The MCP server must not use the service role key. "
         "Set SUPABASE_ANON_KEY in your .env file."
     )
-sb = create_client(
+
+
+class _RetryTransport(httpx.AsyncBaseTransport):
+    """Retry transient Supabase failures with capped, full-jitter exponential backoff.
+
+    The server only reads (anon key + RLS; SELECTs and STABLE RPCs), so every
+    request is safe to replay. Retries connect failures and 429/502/503/504;
+    other responses, including 4xx client errors, pass straight through. A
+    Retry-After header is honored unless it exceeds ``max_delay``, in which
+    case the response is returned as-is.
+    """
+
+    RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+    ):
+        self._transport = transport
+        self._attempts = attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2 ** attempt))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self._attempts - 1):
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                delay, reason = self._backoff(attempt), type(e).__name__
+            else:
+                if response.status_code not in self.RETRY_STATUSES:
+                    return response
+                try:
+                    delay = float(response.headers["Retry-After"])
+                except (KeyError, ValueError):
+                    delay = self._backoff(attempt)
+                if delay > self._max_delay:
+                    return response
+                reason = str(response.status_code)
+                await response.aclose()
+            logger.warning("Supabase %s %s: %s, retry %d/%d in %.2fs",
+                           request.method, request.url.path, reason, attempt + 1, self._attempts - 1, delay)
+            await asyncio.sleep(delay)
+        # Final attempt — errors and responses propagate unchanged
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# Shared keep-alive pool so concurrent tool calls don't queue behind one
+# connection. Supabase pools the Postgres side (Supavisor) behind PostgREST,
+# so this only bounds HTTP connections; tool calls past the cap wait for a slot.
+_HTTP_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_MAX_CONNECTIONS", "50"))
+_http = httpx.AsyncClient(
+    transport=_RetryTransport(httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=min(20, _HTTP_MAX_CONNECTIONS),
+            keepalive_expiry=300,  # drop idle connections after 5 min
+        ),
+        http2=True,
+    )),
+    # 120s matches supabase-py's PostgREST default; connects fail fast
+    timeout=httpx.Timeout(120.0, connect=5.0),
+    follow_redirects=True,
+)
+
+# Async client so tool handlers never block the event loop on PostgREST I/O
+sb = AsyncClient(
     os.environ["SUPABASE_URL"],
     _supabase_key,
+    options=AsyncClientOptions(httpx_client=_http),
 )
 
-_reg_types: dict[str, int] = {}
-_reg_types_by_id: dict[int, str] = {}
+# Read-only views, swapped wholesale on refresh
+_REG_TYPES_TTL = 600
+_reg_types: Mapping[str, int] = MappingProxyType({})
+_reg_types_by_id: Mapping[int, str] = MappingProxyType({})
+_reg_types_ts = 0.0
+_reg_types_lock = asyncio.Lock()
 
 
-def _ensure_reg_types() -> None:
-    """Populate the regulation type caches on first call."""
-    global _reg_types, _reg_types_by_id
-    if _reg_types:
-        return
-    result = sb.table("regulation_types").select("id, code").execute()
-    _reg_types = {r["code"]: r["id"] for r in result.data}
-    _reg_types_by_id = {r["id"]: r["code"] for r in result.data}
+def _reg_types_fresh() -> bool:
+    return bool(_reg_types) and time.monotonic() - _reg_types_ts < _REG_TYPES_TTL
 
 
-def _get_law_count() -> int:
+async def _get_reg_types() -> None:
+    """Load the regulation type maps (code ↔ id), refreshing them every 10 min.
+
+    Preloaded from the server lifespan, so tool calls normally return without
+    a DB round-trip. A failed refresh keeps serving the previous maps.
+    """
+    global _reg_types_ts
+    if _reg_types_fresh():
+        return
+    async with _reg_types_lock:
+        # Single-flight: callers that queued behind the loader reuse its result
+        if _reg_types_fresh():
+            return
+        try:
+            result = await sb.table("regulation_types").select("id, code").execute()
+        except Exception as e:
+            if not _reg_types:
+                raise
+            logger.warning("regulation_types refresh failed, keeping cached maps: %s", e)
+            _reg_types_ts = time.monotonic()
+            return
+        _set_reg_types(result.data)
+
+
+def _set_reg_types(rows: list[dict]) -> None:
+    global _reg_types, _reg_types_by_id, _reg_types_ts
+    _reg_types = MappingProxyType({r["code"]: r["id"] for r in rows})
+    _reg_types_by_id = MappingProxyType({r["id"]: r["code"] for r in rows})
+    _reg_types_ts = time.monotonic()
+
+
+_LAW_COUNT_TTL = 300
+_law_count: int | None = None
+_law_count_ts = 0.0
+_law_count_lock = asyncio.Lock()
+# (count, formatted suffix) — rebuilt only when the law count changes
+_no_results_suffix: tuple[int, str] | None = None
+
+
+async def _get_law_count() -> int:
     """Return cached count of laws in the database (5-min TTL)."""
-    cached = _law_count_cache.get("count")
-    if cached is not None:
-        return cached
-    try:
-        result = sb.table("works").select("id", count="exact").execute()
-        count = result.count or 0
-    except Exception:
-        count = 0
-    _law_count_cache.set("count", count)
-    return count
+    global _law_count, _law_count_ts
+    if _law_count is not None and time.monotonic() - _law_count_ts < _LAW_COUNT_TTL:
+        return _law_count
+    async with _law_count_lock:
+        # Single-flight: another caller may have refreshed it while we waited
+        if _law_count is not None and time.monotonic() - _law_count_ts < _LAW_COUNT_TTL:
+            return _law_count
+        try:
+            result = await sb.table("works").select("id", count="exact", head=True).execute()
+            _law_count = result.count or 0
+        except Exception:
+            # Keep the last good count rather than report a database of 0 laws
+            if _law_count is None:
+                _law_count = 0
+        _law_count_ts = time.monotonic()
+        return _law_count
+
+
+async def _bootstrap() -> None:
+    """Populate the regulation type maps and law count in one round-trip (migration 060)."""
+    global _law_count, _law_count_ts
+    resp = await sb.rpc("mcp_bootstrap", {}).execute()
+    _set_reg_types(resp.data["regulation_types"])
+    _law_count, _law_count_ts = resp.data["law_count"], time.monotonic()
 
 
 def _with_disclaimer(result: dict | list) -> dict | list:
-    """Append legal disclaimer to every tool response."""
+    """Return the tool response with the legal disclaimer attached.
+
+    Builds new dicts rather than mutating, so payloads held in the response
+    caches stay disclaimer-free and are never modified after being stored.
+    """
     if isinstance(result, dict):
-        result["disclaimer"] = DISCLAIMER
-        return result
-    for item in result:
-        if isinstance(item, dict):
-            item["disclaimer"] = DISCLAIMER
-    return result
+        return {**result, "disclaimer": DISCLAIMER}
+    return [
+        {**item, "disclaimer": DISCLAIMER} if isinstance(item, dict) else item
+        for item in result
+    ]
 
 
-def _no_results_message(context: str) -> str:
+async def _no_results_message(context: str) -> str:
     """Build a 'not in DB' caveat message."""
-    n = _get_law_count()
-    return (
-        f"No results found for {context} in our database of {n} laws. "
-        "This does NOT mean no such law exists — our database covers "
-        "a limited set of Indonesian regulations."
-    )
+    global _no_results_suffix
+    n = await _get_law_count()
+    if _no_results_suffix is None or _no_results_suffix[0] != n:
+        _no_results_suffix = (n, (
+            f" in our database of {n} laws. "
+            "This does NOT mean no such law exists — our database covers "
+            "a limited set of Indonesian regulations."
+        ))
+    return f"No results found for {context}{_no_results_suffix[1]}"
 
 
 # ---------------------------------------------------------------------------
 # Cross-reference extraction
 # ---------------------------------------------------------------------------
 
+# Atomic groups / possessive quantifiers (Python 3.11+) so optional suffixes
+# never backtrack once matched. The "sebagaimana dimaksud ..." prefix was
+# non-capturing and optional, so it is dropped rather than matched. No
+# re.ASCII: text loaded outside the OCR pipeline (load_uud, revisions) can
+# still contain NBSP, which only Unicode \s matches.
 CROSS_REF_PATTERN = re.compile(
-    r'(?:sebagaimana\s+dimaksud\s+(?:dalam|pada)\s+)?'
-    r'Pasal\s+(\d+[A-Z]?)'
-    r'(?:\s+ayat\s+\((\d+)\))?'
-    r'(?:\s+(?:huruf\s+([a-z])\.?))?'
-    r'(?:\s+(?:Undang-Undang|UU)\s+(?:Nomor\s+)?(\d+)\s+Tahun\s+(\d{4}))?',
+    r'\bPasal\s++(\d++[A-Z]?+)'
+    r'(?>\s+ayat\s+\((\d+)\))?+'
+    r'(?>\s+huruf\s+([a-z])\.?)?+'
+    r'(?>\s+(?:Undang-Undang|UU)\s+(?:Nomor\s+)?(\d+)\s+Tahun\s+(\d{4}))?+',
     re.IGNORECASE,
 )
 
 
+def _cross_ref(pasal: str, ayat: str, huruf: str, law_number: str, law_year: str) -> dict:
+    """Build a cross-reference dict from regex groups, keeping only present fields."""
+    ref: dict[str, str | int] = {"pasal": pasal}
+    if ayat:
+        ref["ayat"] = ayat
+    if huruf:
+        ref["huruf"] = huruf
+    if law_number and law_year:
+        ref["law_number"] = law_number
+        ref["law_year"] = int(law_year)
+    return ref
+
+
 def extract_cross_references(text: str) -> list[dict]:
     """Extract cross-references to other articles from legal text."""
-    refs, seen = [], set()
-    for m in CROSS_REF_PATTERN.finditer(text):
-        key = (m.group(1), m.group(2), m.group(4), m.group(5))
-        if key in seen:
-            continue
-        seen.add(key)
-        ref: dict[str, str | int] = {"pasal": m.group(1)}
-        if m.group(2):
-            ref["ayat"] = m.group(2)
-        if m.group(3):
-            ref["huruf"] = m.group(3)
-        if m.group(4) and m.group(5):
-            ref["law_number"] = m.group(4)
-            ref["law_year"] = int(m.group(5))
-        refs.append(ref)
-    return refs
+    # findall yields group tuples without materializing Match objects; keep the
+    # first match per (pasal, ayat, law_number, law_year) in document order
+    first: dict[tuple[str, ...], tuple[str, ...]] = {}
+    for groups in CROSS_REF_PATTERN.findall(text):
+        first.setdefault((groups[0], groups[1], groups[3], groups[4]), groups)
+    return [_cross_ref(*groups) for groups in first.values()]
 
 
 # ---------------------------------------------------------------------------
@@ -168,43 +335,48 @@ def extract_cross_references(text: str) -> list[dict]:
 # ---------------------------------------------------------------------------
 
 class TTLCache:
-    """Simple in-memory cache with per-key TTL expiration and max size."""
+    """In-memory LRU cache with per-key TTL expiration and max size.
+
+    Uses the monotonic clock so wall-clock adjustments can't expire or
+    resurrect entries.
+    """
 
     def __init__(self, ttl_seconds: int = 3600, maxsize: int = 1000):
         self._ttl = ttl_seconds
         self._maxsize = maxsize
-        self._data: dict[str, tuple[float, Any]] = {}
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
 
     def get(self, key: str) -> Any | None:
         entry = self._data.get(key)
         if entry is None:
             return None
         ts, value = entry
-        if time.time() - ts > self._ttl:
+        if time.monotonic() - ts > self._ttl:
             del self._data[key]
             return None
+        self._data.move_to_end(key)
         return value
 
     def set(self, key: str, value: Any) -> None:
-        # Evict expired entries when at capacity
-        if len(self._data) >= self._maxsize:
-            now = time.time()
-            expired = [k for k, (ts, _) in self._data.items() if now - ts > self._ttl]
-            for k in expired:
-                del self._data[k]
-        # If still at capacity, evict oldest entry
-        if len(self._data) >= self._maxsize:
-            oldest_key = min(self._data, key=lambda k: self._data[k][0])
-            del self._data[oldest_key]
-        self._data[key] = (time.time(), value)
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        # Evict least recently used entries beyond capacity
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
 
     def clear(self) -> None:
         self._data.clear()
 
 
+# Response caches hold orjson-encoded payloads (without disclaimer) — compact
+# bytes instead of live dict trees; decoded per hit. Pasal text is effectively
+# immutable; status flips when an amendment lands, so it expires sooner.
 _pasal_cache = TTLCache(ttl_seconds=3600, maxsize=2000)
-_status_cache = TTLCache(ttl_seconds=3600, maxsize=2000)
-_law_count_cache = TTLCache(ttl_seconds=300, maxsize=10)
+_status_cache = TTLCache(ttl_seconds=300, maxsize=512)
+_pasals_cache = TTLCache(ttl_seconds=3600, maxsize=512)
+# search_laws queries (+ filters) that matched nothing; short TTL so newly
+# loaded laws show up quickly
+_search_miss_cache = TTLCache(ttl_seconds=60, maxsize=1000)
 
 
 # ---------------------------------------------------------------------------
@@ -212,26 +384,36 @@ _law_count_cache = TTLCache(ttl_seconds=300, maxsize=10)
 # ---------------------------------------------------------------------------
 
 class RateLimiter:
-    """Simple sliding window rate limiter per tool."""
+    """Token bucket rate limiter per tool.
+
+    Holds up to ``max_calls`` tokens, refilled continuously at
+    ``max_calls / window_seconds`` per second on the monotonic clock. Tokens
+    are kept as integers in units of 1/``window_ns`` so refill math is exact.
+    State is two ints, so ``check()`` is O(1). Tool handlers run on the event
+    loop thread and ``check()`` never awaits, so no lock is needed.
+    """
 
     def __init__(self, max_calls: int, window_seconds: int = 60):
-        self._max = max_calls
-        self._window = window_seconds
-        self._calls: list[float] = []
+        self._rate = max_calls                  # units added per elapsed ns
+        self._cost = window_seconds * 10**9     # units per call
+        self._capacity = max_calls * self._cost
+        self._tokens = self._capacity
+        self._last_ns = time.monotonic_ns()
 
     def check(self) -> int | None:
         """Return None if allowed, or seconds to wait if rate-limited."""
-        now = time.time()
-        cutoff = now - self._window
-        self._calls = [t for t in self._calls if t > cutoff]
-        if len(self._calls) >= self._max:
-            oldest = self._calls[0]
-            return int(oldest + self._window - now) + 1
-        self._calls.append(now)
+        now_ns = time.monotonic_ns()
+        self._tokens = min(self._capacity, self._tokens + (now_ns - self._last_ns) * self._rate)
+        self._last_ns = now_ns
+        if self._tokens < self._cost:
+            wait_ns = -(-(self._cost - self._tokens) // self._rate)
+            return -(-wait_ns // 10**9)
+        self._tokens -= self._cost
         return None
 
     def reset(self) -> None:
-        self._calls.clear()
+        self._tokens = self._capacity
+        self._last_ns = time.monotonic_ns()
 
 
 _rate_limiters = {
@@ -260,57 +442,60 @@ def _check_rate_limit(tool_name: str) -> dict | None:
 # Shared database helpers
 # ---------------------------------------------------------------------------
 
-def _find_work(law_type: str, law_number: str, year: int) -> dict | None:
-    """Look up a work by regulation type code, number, and year.
-
-    Returns the work row dict, or None if not found.
-    Populates the regulation type caches as a side effect.
-    """
-    _ensure_reg_types()
-    reg_type_id = _reg_types.get(law_type.upper())
-    if not reg_type_id:
-        return None
-    result = sb.table("works").select("*").match({
-        "regulation_type_id": reg_type_id,
-        "number": law_number,
-        "year": year,
-    }).execute()
-    if not result.data:
-        return None
-    return result.data[0]
-
-
-def _get_chapter_info(node: dict) -> str:
-    """Retrieve the parent chapter (BAB) heading for a document node."""
-    if not node.get("parent_id"):
-        return ""
-    parent = sb.table("document_nodes").select(
-        "node_type, number, heading"
-    ).eq("id", node["parent_id"]).execute()
-    if not parent.data:
+def _format_chapter(parent: dict | None) -> str:
+    """Format the parent chapter (BAB) heading of a document node."""
+    if not parent:
         return ""
-    p = parent.data[0]
-    info = f"{p['node_type'].upper()} {p['number']}"
-    if p.get("heading"):
-        info += f" - {p['heading']}"
+    info = f"{parent['node_type'].upper()} {parent['number']}"
+    if parent.get("heading"):
+        info += f" - {parent['heading']}"
     return info
 
 
-def _get_available_pasals(work_id: int) -> list[str]:
-    """Get list of available pasal numbers for a work."""
-    result = sb.table("document_nodes").select("number").match({
+async def _get_available_pasals(work_id: int) -> list[str]:
+    """Get list of available pasal numbers for a work (cached — repeat typos skip the DB)."""
+    cache_key = str(work_id)
+    cached = _pasals_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    result = await sb.table("document_nodes").select("number").match({
         "work_id": work_id,
         "node_type": "pasal",
     }).order("sort_order").limit(200).execute()
-    return [r["number"] for r in (result.data or [])]
+    pasals = [r["number"] for r in (result.data or [])]
+    _pasals_cache.set(cache_key, pasals)
+    return pasals
 
 
 # ---------------------------------------------------------------------------
 # MCP Tool Endpoints
 # ---------------------------------------------------------------------------
 
+async def _search_no_results(query: str) -> list[dict]:
+    return _with_disclaimer([{
+        "message": await _no_results_message(f"'{query}'"),
+        "suggestion": "Try simpler keywords or remove filters",
+    }])
+
+
+def _search_result(row: dict) -> dict:
+    """Map one search_legal_chunks() row to the search_laws response shape."""
+    meta = row.get("metadata") or {}
+    year = meta.get("year")
+    return {
+        "law_title": meta.get("title_id", ""),
+        "frbr_uri": meta.get("frbr_uri", ""),
+        "regulation_type": meta.get("type", ""),
+        "year": int(year) if year else None,
+        "pasal": f"Pasal {meta.get('pasal', '?')}",
+        "snippet": row.get("snippet", row["content"][:300]),
+        "status": meta.get("status", ""),
+        "relevance_score": round(row["score"], 4),
+    }
+
+
 @mcp.tool
-def search_laws(
+async def search_laws(
     query: str,
     regulation_type: str | None = None,
     year_from: int | None = None,
@@ -336,31 +521,43 @@ def search_laws(
         language: Language filter — "id" (Indonesian, default) or "en" (English translations)
         limit: Maximum number of results (default 10)
     """
+    # Checked before the rate limiter so empty queries don't spend its budget
+    if not query or not query.strip():
+        return _with_disclaimer(
+            [{"error": "Query cannot be empty", "suggestion": "Provide a search term in Indonesian"}]
+        )
+
     rate_err = _check_rate_limit("search_laws")
     if rate_err:
         return [rate_err]
 
-    t0 = time.time()
+    t0 = time.perf_counter()
     logger.info("search_laws called: query=%r type=%s year_from=%s year_to=%s limit=%s",
                 query, regulation_type, year_from, year_to, limit)
 
-    if not query or not query.strip():
-        return _with_disclaimer(
-            [{"error": "Query cannot be empty", "suggestion": "Provide a search term in Indonesian"}]
-        )
-
     limit = min(limit, 50)
 
     metadata_filter: dict = {}
     if regulation_type:
         metadata_filter["type"] = regulation_type.upper()
+    if year_from:
+        metadata_filter["year_from"] = year_from
+    if year_to:
+        metadata_filter["year_to"] = year_to
     if language != "id":
         metadata_filter["language"] = language
 
+    # Filters are inserted in a fixed order, so the dict repr is a stable key part.
+    # limit is left out: a query with no hits has none at any limit.
+    miss_key = f"{' '.join(query.lower().split())}|{metadata_filter}"
+    if _search_miss_cache.get(miss_key):
+        logger.info("search_laws: cached miss for %r", query)
+        return await _search_no_results(query)
+
     try:
-        result = sb.rpc("search_legal_chunks", {
+        result = await sb.rpc("search_legal_chunks", {
             "query_text": query.strip(),
-            "match_count": limit * 3,  # fetch extra to filter
+            "match_count": limit,
             "metadata_filter": metadata_filter,
         }).execute()
     except Exception as e:
@@ -368,60 +565,22 @@ def search_laws(
         return _with_disclaimer([{"error": "Search failed. Please try again later."}])
 
     if not result.data:
-        logger.info("search_laws: no results for %r (%.0fms)", query, (time.time() - t0) * 1000)
-        return _with_disclaimer([{
-            "message": _no_results_message(f"'{query}'"),
-            "suggestion": "Try simpler keywords or remove filters",
-        }])
-
-    try:
-        work_ids = list(set(r["work_id"] for r in result.data))
-        works_result = sb.table("works").select(
-            "id, frbr_uri, title_id, number, year, status, regulation_type_id"
-        ).in_("id", work_ids).execute()
-        works_map = {w["id"]: w for w in works_result.data}
-    except Exception as e:
-        logger.error("search_laws metadata fetch failed: %s", e)
-        return _with_disclaimer([{"error": "Failed to fetch law metadata. Please try again later."}])
-
-    _ensure_reg_types()
-
-    enriched = []
-    for r in result.data:
-        work = works_map.get(r["work_id"])
-        if not work:
-            continue
-
-        # Apply year filter
-        if year_from and work["year"] < year_from:
-            continue
-        if year_to and work["year"] > year_to:
-            continue
+        logger.info("search_laws: no results for %r (%.0fms)", query, (time.perf_counter() - t0) * 1000)
+        _search_miss_cache.set(miss_key, True)
+        return await _search_no_results(query)
 
-        reg_code = _reg_types_by_id.get(work["regulation_type_id"], "")
-        meta = r.get("metadata", {})
-
-        enriched.append({
-            "law_title": work["title_id"],
-            "frbr_uri": work["frbr_uri"],
-            "regulation_type": reg_code,
-            "year": work["year"],
-            "pasal": f"Pasal {meta.get('pasal', '?')}",
-            "snippet": r.get("snippet", r["content"][:300]),
-            "status": work["status"],
-            "relevance_score": round(r["score"], 4),
-        })
-
-        if len(enriched) >= limit:
-            break
+    # Filters and the works join run inside the RPC (migration 054), so rows map
+    # straight into the response. match_count only caps Layer 3: the identity
+    # (up to 3) and works FTS (up to 5) layers come on top, so cap here.
+    enriched = [_search_result(r) for r in result.data[:limit]]
 
     logger.info("search_laws: %d results for %r (%.0fms)",
-                len(enriched), query, (time.time() - t0) * 1000)
+                len(enriched), query, (time.perf_counter() - t0) * 1000)
     return _with_disclaimer(enriched)
 
 
 @mcp.tool
-def get_pasal(
+async def get_pasal(
     law_type: str,
     law_number: str,
     year: int,
@@ -446,77 +605,76 @@ def get_pasal(
     cached = _pasal_cache.get(cache_key)
     if cached is not None:
         logger.info("get_pasal cache hit: %s", cache_key)
-        return cached
+        return _with_disclaimer(orjson.loads(cached))
 
-    t0 = time.time()
+    t0 = time.perf_counter()
     logger.info("get_pasal called: %s %s/%d pasal %s", law_type, law_number, year, pasal_number)
 
     try:
-        work = _find_work(law_type, law_number, year)
-        if not work:
-            # Distinguish "unknown type" from "work not found"
-            _ensure_reg_types()
-            if not _reg_types.get(law_type.upper()):
-                return _with_disclaimer({"error": f"Unknown regulation type: {law_type}"})
+        await _get_reg_types()
+        reg_type_id = _reg_types.get(law_type.upper())
+        if not reg_type_id:
+            return _with_disclaimer({"error": f"Unknown regulation type: {law_type}"})
+
+        # Work lookup, pasal, ayat and parent chapter in one query, truncated
+        # server-side (migrations 055 + 058)
+        resp = await sb.rpc("get_pasal_full", {
+            "p_reg_type_id": reg_type_id,
+            "p_number": law_number,
+            "p_year": year,
+            "p_pasal_number": pasal_number,
+            "p_max_len": PASAL_MAX_CHARS,
+        }).execute()
+        bundle = resp.data
+
+        if not bundle:
             return _with_disclaimer({
-                "error": _no_results_message(f"'{law_type} {law_number}/{year}'"),
+                "error": await _no_results_message(f"'{law_type} {law_number}/{year}'"),
                 "suggestion": "Use list_laws to check available regulations, or verify type/number/year.",
             })
 
-        node_result = sb.table("document_nodes").select("*").match({
-            "work_id": work["id"],
-            "node_type": "pasal",
-            "number": pasal_number,
-        }).execute()
-
-        if not node_result.data:
+        work = bundle["work"]
+        node = bundle["pasal"]
+        if not node:
             return _with_disclaimer({
                 "error": f"Pasal {pasal_number} not found in {law_type} {law_number}/{year}",
                 "suggestion": "Check available_pasals below, or use search_laws to find the right article.",
-                "available_pasals": _get_available_pasals(work["id"]),
+                "available_pasals": await _get_available_pasals(work["id"]),
             })
 
-        node = node_result.data[0]
-
-        ayat_result = sb.table("document_nodes").select("number, content_text").match({
-            "work_id": work["id"],
-            "parent_id": node["id"],
-            "node_type": "ayat",
-        }).order("sort_order").execute()
-
-        chapter_info = _get_chapter_info(node)
-
-        content = node["content_text"] or ""
-        cross_refs = extract_cross_references(content)
-        ayat_data = ayat_result.data or []
-        if len(content) > 3000:
-            content = (
-                content[:3000]
-                + f"\n\n[...truncated. Full: {len(node['content_text'])} chars. "
+        content = node["content"] or ""
+        ayat_data = node.get("ayat") or []
+        # content + tail is the untruncated text, so references past the cut are still found
+        cross_refs = extract_cross_references(
+            "\n".join([content + (node.get("tail") or ""), *(a["text"] or "" for a in ayat_data)])
+        )
+        if node["full_length"] > PASAL_MAX_CHARS:
+            content += (
+                f"\n\n[...truncated. Full: {node['full_length']} chars. "
                 f"This article has {len(ayat_data)} ayat.]"
             )
 
-        logger.info("get_pasal: found pasal %s (%.0fms)", pasal_number, (time.time() - t0) * 1000)
-        result = _with_disclaimer({
+        logger.info("get_pasal: found pasal %s (%.0fms)", pasal_number, (time.perf_counter() - t0) * 1000)
+        result = {
             "law_title": work["title_id"],
             "frbr_uri": work["frbr_uri"],
             "pasal_number": pasal_number,
-            "chapter": chapter_info,
+            "chapter": _format_chapter(node.get("chapter")),
             "content_id": content,
-            "ayat": [{"number": a["number"], "text": a["content_text"]} for a in ayat_data],
+            "ayat": ayat_data,
             "cross_references": cross_refs,
             "status": work["status"],
             "source_url": work.get("source_url", ""),
-        })
-        _pasal_cache.set(cache_key, result)
-        return result
+        }
+        _pasal_cache.set(cache_key, orjson.dumps(result))
+        return _with_disclaimer(result)
     except Exception as e:
         logger.error("get_pasal failed: %s", e)
         return _with_disclaimer({"error": "Failed to retrieve pasal. Please try again later."})
 
 
 @mcp.tool
-def get_law_status(
+async def get_law_status(
     law_type: str,
     law_number: str,
     year: int,
@@ -540,90 +698,66 @@ def get_law_status(
     cached = _status_cache.get(cache_key)
     if cached is not None:
         logger.info("get_law_status cache hit: %s", cache_key)
-        return cached
+        return _with_disclaimer(orjson.loads(cached))
 
-    t0 = time.time()
+    t0 = time.perf_counter()
     logger.info("get_law_status called: %s %s/%d", law_type, law_number, year)
 
     try:
-        work = _find_work(law_type, law_number, year)
-        if not work:
-            _ensure_reg_types()
-            if not _reg_types.get(law_type.upper()):
-                return _with_disclaimer({"error": f"Unknown regulation type: {law_type}"})
+        await _get_reg_types()
+        reg_type_id = _reg_types.get(law_type.upper())
+        if not reg_type_id:
+            return _with_disclaimer({"error": f"Unknown regulation type: {law_type}"})
+
+        # Work, relationships and related works are joined in SQL (migration 053)
+        status = await sb.rpc("get_law_status_full", {
+            "p_reg_type_id": reg_type_id,
+            "p_number": law_number,
+            "p_year": year,
+        }).execute()
+        data = status.data
+        if not data:
             return _with_disclaimer({
-                "error": _no_results_message(f"'{law_type} {law_number}/{year}'"),
+                "error": await _no_results_message(f"'{law_type} {law_number}/{year}'"),
             })
 
-        rels = sb.table("work_relationships").select(
-            "*, relationship_types(code, name_id, name_en)"
-        ).or_(
-            f"source_work_id.eq.{work['id']},target_work_id.eq.{work['id']}"
-        ).execute()
-
-        rel_rows = rels.data or []
-        related_work_ids = {
-            wid
-            for r in rel_rows
-            for wid in (r["source_work_id"], r["target_work_id"])
-        } - {work["id"]}
-
-        related_works: dict[int, dict] = {}
-        if related_work_ids:
-            rw = sb.table("works").select(
-                "id, frbr_uri, title_id, number, year, status, regulation_type_id"
-            ).in_("id", list(related_work_ids)).execute()
-            related_works = {w["id"]: w for w in rw.data}
-
-        amendments = []
-        related = []
-        for r in rel_rows:
-            rel_type = r.get("relationship_types", {})
-            other_id = r["target_work_id"] if r["source_work_id"] == work["id"] else r["source_work_id"]
-            other_work = related_works.get(other_id)
-            if not other_work:
-                continue
-
-            other_code = _reg_types_by_id.get(other_work["regulation_type_id"], "")
-            entry = {
-                "relationship": rel_type.get("name_en", ""),
-                "relationship_id": rel_type.get("name_id", ""),
-                "law": f"{other_code} {other_work['number']}/{other_work['year']}",
-                "full_title": other_work["title_id"],
-                "frbr_uri": other_work["frbr_uri"],
-            }
-
-            if rel_type.get("code") in AMENDMENT_REL_CODES:
-                amendments.append(entry)
-            else:
-                related.append(entry)
-
         logger.info("get_law_status: %s %s/%d status=%s (%.0fms)",
-                     law_type, law_number, year, work["status"], (time.time() - t0) * 1000)
-        result = _with_disclaimer({
-            "law_title": work["title_id"],
-            "frbr_uri": work["frbr_uri"],
-            "status": work["status"],
-            "status_explanation": STATUS_EXPLANATIONS.get(work["status"], ""),
-            "date_enacted": str(work["date_enacted"]) if work.get("date_enacted") else None,
-            "amendments": amendments,
-            "related_laws": related,
-        })
-        _status_cache.set(cache_key, result)
-        return result
+                     law_type, law_number, year, data["status"], (time.perf_counter() - t0) * 1000)
+        result = {
+            "law_title": data["law_title"],
+            "frbr_uri": data["frbr_uri"],
+            "status": data["status"],
+            "status_explanation": STATUS_EXPLANATIONS.get(data["status"], ""),
+            "date_enacted": data.get("date_enacted"),
+            "amendments": data.get("amendments") or [],
+            "related_laws": data.get("related_laws") or [],
+        }
+        _status_cache.set(cache_key, orjson.dumps(result))
+        return _with_disclaimer(result)
     except Exception as e:
         logger.error("get_law_status failed: %s", e)
         return _with_disclaimer({"error": "Failed to retrieve law status. Please try again later."})
 
 
+# ILIKE escapes for a user-supplied substring; backslash is PostgreSQL's default escape
+_LIKE_ESCAPES = str.maketrans({"\\": r"\\", "%": r"\%", "_": r"\_"})
+
+
+@functools.lru_cache(maxsize=256)
+def _title_pattern(search: str) -> str:
+    """Escaped ILIKE substring pattern for list_laws' title search (served by a trigram index)."""
+    return f"%{search.translate(_LIKE_ESCAPES)}%"
+
+
 @mcp.tool
-def list_laws(
+async def list_laws(
     regulation_type: str | None = None,
     year: int | None = None,
     status: str | None = None,
     search: str | None = None,
     page: int = 1,
     per_page: int = 20,
+    cursor: str | None = None,
 ) -> dict:
     """Browse available Indonesian regulations with optional filters.
 
@@ -635,62 +769,58 @@ def list_laws(
         year: Filter by year enacted
         status: Filter by status — "berlaku" (in force), "dicabut" (revoked), "diubah" (amended)
         search: Keyword filter on law title
-        page: Page number (default 1)
+        page: Page number (default 1). Ignored when cursor is given.
         per_page: Results per page (default 20)
+        cursor: Opaque next_cursor from a previous list_laws response — faster than page for deep browsing.
+            Cursor responses have total=null; the total comes with the first page.
     """
     rate_err = _check_rate_limit("list_laws")
     if rate_err:
         return rate_err
 
-    t0 = time.time()
-    logger.info("list_laws called: type=%s year=%s status=%s search=%s page=%d",
-                regulation_type, year, status, search, page)
+    t0 = time.perf_counter()
+    logger.info("list_laws called: type=%s year=%s status=%s search=%s page=%d cursor=%s",
+                regulation_type, year, status, search, page, cursor)
 
     try:
-        _ensure_reg_types()
+        await _get_reg_types()
 
         # Clamp pagination params to safe ranges
         page = max(1, page)
         per_page = max(1, min(100, per_page))
 
-        query = sb.table("works").select("*, regulation_types(code, name_id)", count="exact")
-
-        if regulation_type:
-            reg_type_id = _reg_types.get(regulation_type.upper())
-            if reg_type_id:
-                query = query.eq("regulation_type_id", reg_type_id)
-
-        if year:
-            query = query.eq("year", year)
-
-        if status:
-            query = query.eq("status", status)
-
-        if search:
-            safe_search = search.replace("%", r"\%").replace("_", r"\_")
-            query = query.ilike("title_id", f"%{safe_search}%")
-
-        offset = (page - 1) * per_page
-        result = query.order("year", desc=True).range(offset, offset + per_page - 1).execute()
-
-        total = result.count or 0
-        laws = [
-            {
-                "frbr_uri": w["frbr_uri"],
-                "title": w["title_id"],
-                "regulation_type": w.get("regulation_types", {}).get("code", ""),
-                "number": w["number"],
-                "year": w["year"],
-                "status": w["status"],
-            }
-            for w in (result.data or [])
-        ]
+        cur_year = cur_id = None
+        if cursor:
+            # Keyset: (year, id) < cursor, read off idx_works_year_id — the page costs
+            # O(per_page) at any depth, and the total is not recounted
+            try:
+                cur_year, cur_id = (int(part) for part in cursor.split(":"))
+            except ValueError:
+                return _with_disclaimer({"error": f"Invalid cursor: {cursor}"})
+
+        # Page, next cursor and (first page only) total in one RPC (migration 059);
+        # ordered by (year, id) desc so both paging modes are stable
+        resp = await sb.rpc("list_works_page", {
+            "p_reg_type_id": _reg_types.get(regulation_type.upper()) if regulation_type else None,
+            "p_year": year or None,
+            "p_status": status or None,
+            "p_title_pattern": _title_pattern(search) if search else None,
+            "p_cursor_year": cur_year,
+            "p_cursor_id": cur_id,
+            "p_offset": 0 if cursor else (page - 1) * per_page,
+            "p_limit": per_page,
+        }).execute()
+        data = resp.data or {}
+        total = data.get("total")
+        laws = data.get("laws") or []
+        next_cursor = data.get("next_cursor")
 
-        logger.info("list_laws: %d/%d results (%.0fms)", len(laws), total, (time.time() - t0) * 1000)
+        logger.info("list_laws: %d/%s results (%.0fms)", len(laws), total, (time.perf_counter() - t0) * 1000)
         return _with_disclaimer({
             "total": total,
             "page": page,
             "per_page": per_page,
+            "next_cursor": next_cursor,
             "laws": laws,
         })
     except Exception as e:
@@ -699,15 +829,19 @@ def list_laws(
 
 
 @mcp.tool
-def ping() -> str:
+async def ping() -> str:
     """Health check — verify the MCP server is running and connected to the database."""
     try:
-        result = sb.table("works").select("id", count="exact").execute()
+        # Planner estimate (pg_class.reltuples) — probes the DB without scanning works
+        result = await sb.table("works").select("id", count="estimated", head=True).execute()
         count = result.count or 0
-        return f"Pasal.id MCP server is running. Database has {count} laws loaded."
     except Exception as e:
         logger.error("ping DB check failed: %s", e)
         return "Server running but database connection failed."
+    if not _reg_types:
+        # Startup preload failed and no tool call has loaded them since
+        return "Server running but regulation types are not loaded."
+    return f"Pasal.id MCP server is running. Database has {count} laws loaded."
 
 
 if __name__ == "__main__":
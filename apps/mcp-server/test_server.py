@@ -1,22 +1,34 @@
 """Tests for Pasal.id MCP server — all Supabase calls are mocked."""
 
+import asyncio
 import os
+import time
+import httpx
+import orjson
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 # Env vars required by server module at import time
 os.environ.setdefault("SUPABASE_URL", "https://fake.supabase.co")
 os.environ.setdefault("SUPABASE_ANON_KEY", "fake-key")
 
-# Patch create_client before importing server so module-level init works
-with patch("supabase.create_client", return_value=MagicMock()):
+# Patch AsyncClient before importing server so module-level init works
+with patch("supabase.AsyncClient", return_value=MagicMock()):
     import server
 
+
 # @mcp.tool wraps functions in FunctionTool; access the raw callables via .fn
-search_laws = server.search_laws.fn
-get_pasal = server.get_pasal.fn
-get_law_status = server.get_law_status.fn
-list_laws = server.list_laws.fn
+def _sync(tool):
+    """Run an async tool to completion so tests can call it directly."""
+    fn = tool.fn
+    return lambda *args, **kwargs: asyncio.run(fn(*args, **kwargs))
+
+
+search_laws = _sync(server.search_laws)
+get_pasal = _sync(server.get_pasal)
+get_law_status = _sync(server.get_law_status)
+list_laws = _sync(server.list_laws)
+ping = _sync(server.ping)
 
 
 # ---------------------------------------------------------------------------
@@ -29,15 +41,25 @@ _CHAINABLE = (
 )
 
 
-def _qm(data: list | None = None, count: int = 0):
+def _qm(data: list | dict | None = None, count: int = 0):
     """Chainable query mock that mimics the PostgREST query builder."""
     m = MagicMock()
     for attr in _CHAINABLE:
         getattr(m, attr).return_value = m
-    m.execute.return_value = MagicMock(data=data or [], count=count)
+    m.execute = AsyncMock(return_value=MagicMock(data=data or [], count=count))
     return m
 
 
+def _route(mapping: dict, default=None):
+    """``sb.table`` side effect that returns a prebuilt mock per table name.
+
+    Tables missing from ``mapping`` share one empty query mock, built once
+    per call instead of once per ``sb.table()`` lookup.
+    """
+    default = default if default is not None else _qm()
+    return lambda name: mapping.get(name, default)
+
+
 # ---------------------------------------------------------------------------
 # Fixtures
 # ---------------------------------------------------------------------------
@@ -47,10 +69,13 @@ def _reset():
     """Clear caches and reset mocks between every test."""
     server._reg_types = {}
     server._reg_types_by_id = {}
+    server._reg_types_ts = 0.0
     server._law_count = None
     server._law_count_ts = 0.0
     server._pasal_cache.clear()
     server._status_cache.clear()
+    server._pasals_cache.clear()
+    server._search_miss_cache.clear()
     for limiter in server._rate_limiters.values():
         limiter.reset()
     server.sb.reset_mock()
@@ -62,6 +87,7 @@ def reg_cache():
     """Pre-populate the regulation-type cache (skips the DB lookup)."""
     server._reg_types = {"UU": 1, "PP": 2, "PERPRES": 3}
     server._reg_types_by_id = {1: "UU", 2: "PP", 3: "PERPRES"}
+    server._reg_types_ts = time.monotonic()
 
 
 # ===================================================================
@@ -80,59 +106,87 @@ class TestSearchLaws:
         assert len(result) == 1
         assert "error" in result[0]
 
+    def test_empty_query_skips_rate_limiter(self):
+        limiter = server.RateLimiter(1)
+        with patch.dict(server._rate_limiters, {"search_laws": limiter}):
+            for _ in range(3):
+                search_laws("")
+        assert limiter.check() is None
+
     def test_limit_capped_at_50(self, reg_cache):
-        server.sb.rpc.return_value.execute.return_value = MagicMock(data=[])
+        server.sb.rpc.return_value = _qm(data=[])
         search_laws("test", limit=100)
 
         rpc_args = server.sb.rpc.call_args[0][1]
-        assert rpc_args["match_count"] == 50 * 3  # limit capped to 50, then *3
+        assert rpc_args["match_count"] == 50
 
-    def test_year_filter_excludes_outside_range(self, reg_cache):
-        server.sb.rpc.return_value.execute.return_value = MagicMock(data=[
-            {"work_id": 1, "content": "a", "score": 0.9, "metadata": {"pasal": "1"}},
-            {"work_id": 2, "content": "b", "score": 0.8, "metadata": {"pasal": "2"}},
-            {"work_id": 3, "content": "c", "score": 0.7, "metadata": {"pasal": "3"}},
-        ])
+    def test_year_range_pushed_to_rpc(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=[])
+        search_laws("test", regulation_type="uu", year_from=2014, year_to=2019)
 
-        works_mock = _qm(data=[
-            {"id": 1, "frbr_uri": "/a", "title_id": "T1", "number": "1",
-             "year": 2020, "status": "berlaku", "regulation_type_id": 1},
-            {"id": 2, "frbr_uri": "/b", "title_id": "T2", "number": "2",
-             "year": 2015, "status": "berlaku", "regulation_type_id": 1},
-            {"id": 3, "frbr_uri": "/c", "title_id": "T3", "number": "3",
-             "year": 2010, "status": "berlaku", "regulation_type_id": 1},
-        ])
-        server.sb.table.side_effect = lambda n: works_mock if n == "works" else _qm()
+        rpc_args = server.sb.rpc.call_args[0][1]
+        assert rpc_args["metadata_filter"] == {
+            "type": "UU", "year_from": 2014, "year_to": 2019,
+        }
 
-        result = search_laws("test", year_from=2014, year_to=2019)
-        assert len(result) == 1
-        assert result[0]["year"] == 2015
+    def test_language_pushed_to_rpc(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=[])
+        search_laws("minimum wage", language="en")
+
+        rpc_args = server.sb.rpc.call_args[0][1]
+        assert rpc_args["metadata_filter"] == {"language": "en"}
 
     def test_unknown_regulation_type_still_searches(self, reg_cache):
-        server.sb.rpc.return_value.execute.return_value = MagicMock(data=[])
+        server.sb.rpc.return_value = _qm(data=[])
         result = search_laws("test", regulation_type="UNKNOWN")
         assert isinstance(result, list)
         # Returns "no results" message, not an error
         assert "error" not in result[0]
 
     def test_results_enriched_with_expected_keys(self, reg_cache):
-        server.sb.rpc.return_value.execute.return_value = MagicMock(data=[
+        server.sb.rpc.return_value = _qm(data=[
             {"work_id": 1, "content": "text", "score": 0.95,
-             "metadata": {"pasal": "5"}},
-        ])
-        works_mock = _qm(data=[
-            {"id": 1, "frbr_uri": "/akn/id/act/uu/2003/13",
-             "title_id": "UU Ketenagakerjaan", "number": "13",
-             "year": 2003, "status": "berlaku", "regulation_type_id": 1},
+             "metadata": {"type": "UU", "number": "13", "year": "2003", "pasal": "5",
+                          "title_id": "UU Ketenagakerjaan",
+                          "frbr_uri": "/akn/id/act/uu/2003/13", "status": "berlaku"}},
         ])
-        server.sb.table.side_effect = lambda n: works_mock if n == "works" else _qm()
 
         result = search_laws("ketenagakerjaan")
         assert len(result) == 1
+        assert result[0]["year"] == 2003
+        assert result[0]["regulation_type"] == "UU"
+        server.sb.table.assert_not_called()
         for key in ("law_title", "frbr_uri", "regulation_type",
                      "pasal", "status", "relevance_score"):
             assert key in result[0], f"Missing key: {key}"
 
+    def test_results_capped_at_limit(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=[
+            {"work_id": i, "content": "text", "score": 1.0 / i,
+             "metadata": {"type": "UU", "number": str(i), "year": "2003", "pasal": "1"}}
+            for i in range(1, 9)
+        ])
+
+        result = search_laws("ketenagakerjaan", limit=3)
+        assert len(result) == 3
+        assert [r["relevance_score"] for r in result] == [1.0, 0.5, 0.3333]
+
+    def test_repeated_miss_served_from_cache(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=[])
+        server.sb.table.side_effect = _route({"works": _qm(count=10)})
+
+        search_laws("Tidak Ada", regulation_type="UU")
+        server.sb.rpc.reset_mock()
+        result = search_laws("  tidak   ada ", regulation_type="uu", limit=5)
+
+        server.sb.rpc.assert_not_called()
+        assert "message" in result[0]
+        assert "disclaimer" in result[0]
+
+        # Different filters are a different query
+        search_laws("tidak ada", regulation_type="PP")
+        server.sb.rpc.assert_called_once()
+
 
 # ===================================================================
 # get_pasal
@@ -140,60 +194,60 @@ class TestSearchLaws:
 
 class TestGetPasal:
 
-    @staticmethod
-    def _make_router(work: dict, node_responses: list):
-        """Build a table router for get_pasal tests.
-
-        ``node_responses`` is an ordered list of _qm mocks returned by
-        successive ``sb.table("document_nodes")`` calls.
-        """
-        node_calls = iter(node_responses)
-
-        def router(name):
-            if name == "works":
-                return _qm(data=[work])
-            if name == "document_nodes":
-                return next(node_calls)
-            return _qm()
-        return router
+    WORK = {
+        "id": 1, "title_id": "UU 13/2003",
+        "frbr_uri": "/akn/id/act/uu/2003/13", "number": "13",
+        "year": 2003, "status": "berlaku", "regulation_type_id": 1,
+        "source_url": "https://example.com",
+    }
+
+    @classmethod
+    def _bundle(cls, content="Text", ayat=None, chapter=None, full_length=None):
+        """Build a get_pasal_full() RPC payload."""
+        return {
+            "work": cls.WORK,
+            "pasal": {
+                "content": content,
+                "full_length": len(content) if full_length is None else full_length,
+                "ayat": ayat or [],
+                "chapter": chapter,
+            },
+        }
 
     def test_unknown_law_type_returns_error(self, reg_cache):
         result = get_pasal("FAKE", "1", 2003, "1")
         assert result["error"] == "Unknown regulation type: FAKE"
 
-    def test_missing_pasal_returns_available_pasals(self, reg_cache):
-        work = {"id": 1, "title_id": "T", "frbr_uri": "/a", "number": "13",
-                "year": 2003, "status": "berlaku", "regulation_type_id": 1}
+    def test_missing_law_returns_no_results_message(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=None)
+        server.sb.table.side_effect = _route({"works": _qm(count=100)})  # _get_law_count
 
-        server.sb.table.side_effect = self._make_router(work, [
-            _qm(data=[]),                                       # pasal not found
-            _qm(data=[{"number": "1"}, {"number": "2"}]),       # _get_available_pasals
-        ])
+        result = get_pasal("UU", "99", 2003, "1")
+        assert "100" in result["error"]
+        assert "available_pasals" not in result
+
+    def test_missing_pasal_returns_available_pasals(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data={"work": self.WORK, "pasal": None})
+        nodes = _qm(data=[{"number": "1"}, {"number": "2"}])         # _get_available_pasals
+        server.sb.table.side_effect = _route({"document_nodes": nodes})
 
         result = get_pasal("UU", "13", 2003, "999")
         assert "error" in result
         assert "available_pasals" in result
         assert result["available_pasals"] == ["1", "2"]
 
-    def test_valid_pasal_returns_content(self, reg_cache):
-        work = {
-            "id": 1, "title_id": "UU 13/2003",
-            "frbr_uri": "/akn/id/act/uu/2003/13", "number": "13",
-            "year": 2003, "status": "berlaku", "regulation_type_id": 1,
-            "source_url": "https://example.com",
-        }
-        node = {
-            "id": 10, "content_text": "Setiap pekerja berhak...",
-            "parent_id": 5, "number": "1", "node_type": "pasal",
-        }
-        parent = {"node_type": "bab", "number": "I", "heading": "Ketentuan Umum"}
+        # A second miss on the same work reuses the cached pasal list
+        nodes.execute.reset_mock()
+        get_pasal("UU", "13", 2003, "998")
+        nodes.execute.assert_not_called()
 
-        server.sb.table.side_effect = self._make_router(work, [
-            _qm(data=[node]),                                                   # pasal node
-            _qm(data=[{"number": "1", "content_text": "Ayat satu"},
-                       {"number": "2", "content_text": "Ayat dua"}]),           # ayat children
-            _qm(data=[parent]),                                                 # parent bab
-        ])
+    def test_valid_pasal_returns_content(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=self._bundle(
+            content="Setiap pekerja berhak...",
+            ayat=[{"number": "1", "text": "Ayat satu"},
+                  {"number": "2", "text": "Ayat dua"}],
+            chapter={"node_type": "bab", "number": "I", "heading": "Ketentuan Umum"},
+        ))
 
         result = get_pasal("UU", "13", 2003, "1")
         assert result["content_id"] == "Setiap pekerja berhak..."
@@ -201,29 +255,45 @@ class TestGetPasal:
         assert "BAB I" in result["chapter"]
         assert "Ketentuan Umum" in result["chapter"]
 
-    def test_ayat_ordering_preserved(self, reg_cache):
-        """Server preserves the DB sort order (.order('sort_order'))."""
-        work = {
-            "id": 1, "title_id": "T", "frbr_uri": "/a", "number": "1",
-            "year": 2020, "status": "berlaku", "regulation_type_id": 1,
-            "source_url": "",
-        }
-        node = {
-            "id": 10, "content_text": "Text", "parent_id": None,
-            "number": "5", "node_type": "pasal",
+        name, args = server.sb.rpc.call_args[0]
+        assert name == "get_pasal_full"
+        assert args == {
+            "p_reg_type_id": 1, "p_number": "13", "p_year": 2003,
+            "p_pasal_number": "1", "p_max_len": 3000,
         }
+        server.sb.table.assert_not_called()
 
-        server.sb.table.side_effect = self._make_router(work, [
-            _qm(data=[node]),
-            _qm(data=[{"number": "2", "content_text": "Second"},
-                       {"number": "1", "content_text": "First"},
-                       {"number": "3", "content_text": "Third"}]),
-            # parent_id is None so no parent lookup
-        ])
+    def test_ayat_ordering_preserved(self, reg_cache):
+        """Server preserves the DB sort order (jsonb_agg ... ORDER BY sort_order)."""
+        server.sb.rpc.return_value = _qm(data=self._bundle(ayat=[
+            {"number": "2", "text": "Second"},
+            {"number": "1", "text": "First"},
+            {"number": "3", "text": "Third"},
+        ]))
 
         result = get_pasal("UU", "1", 2020, "5")
         assert [a["number"] for a in result["ayat"]] == ["2", "1", "3"]
 
+    def test_truncated_content_notice_and_ayat_cross_refs(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=self._bundle(
+            content="x" * 3000,
+            full_length=4500,
+            ayat=[{"number": "1", "text": "sebagaimana dimaksud dalam Pasal 7"}],
+        ))
+
+        result = get_pasal("UU", "13", 2003, "1")
+        assert "[...truncated. Full: 4500 chars. This article has 1 ayat.]" in result["content_id"]
+        assert result["cross_references"] == [{"pasal": "7"}]
+
+    def test_cross_refs_found_past_truncation(self, reg_cache):
+        bundle = self._bundle(content="x " * 1500, full_length=3100)
+        bundle["pasal"]["tail"] = "sebagaimana dimaksud dalam Pasal 12 ayat (3)"
+        server.sb.rpc.return_value = _qm(data=bundle)
+
+        result = get_pasal("UU", "13", 2003, "1")
+        assert "Pasal 12" not in result["content_id"]
+        assert result["cross_references"] == [{"pasal": "12", "ayat": "3"}]
+
 
 # ===================================================================
 # get_law_status
@@ -231,91 +301,83 @@ class TestGetPasal:
 
 class TestGetLawStatus:
 
-    def _make_router(self, work, relationships=None, related_works=None):
-        """Build a table router for get_law_status tests."""
-        works_calls = iter([
-            _qm(data=[work]),
-            _qm(data=related_works or []),
-        ])
-
-        def router(name):
-            if name == "works":
-                return next(works_calls)
-            if name == "work_relationships":
-                return _qm(data=relationships or [])
-            return _qm()
-        return router
+    @staticmethod
+    def _status_payload(**overrides):
+        """Build a get_law_status_full() RPC payload."""
+        payload = {
+            "law_title": "T", "frbr_uri": "/a", "status": "berlaku",
+            "date_enacted": None, "amendments": [], "related_laws": [],
+        }
+        payload.update(overrides)
+        return payload
 
     def test_berlaku_status_explanation(self, reg_cache):
-        work = {
-            "id": 1, "title_id": "T", "frbr_uri": "/a", "number": "1",
-            "year": 2020, "status": "berlaku", "regulation_type_id": 1,
-            "date_enacted": None,
-        }
-        server.sb.table.side_effect = self._make_router(work)
+        server.sb.rpc.return_value = _qm(data=self._status_payload())
 
         result = get_law_status("UU", "1", 2020)
         assert "currently in force" in result["status_explanation"]
 
-    def test_amendments_vs_related(self, reg_cache):
-        work = {
-            "id": 1, "title_id": "T", "frbr_uri": "/a", "number": "1",
-            "year": 2020, "status": "diubah", "regulation_type_id": 1,
-            "date_enacted": "2020-01-01",
-        }
-        relationships = [
-            {
-                "source_work_id": 1, "target_work_id": 2,
-                "relationship_types": {
-                    "code": "mengubah", "name_id": "Mengubah", "name_en": "Amends",
-                },
-            },
-            {
-                "source_work_id": 3, "target_work_id": 1,
-                "relationship_types": {
-                    "code": "merujuk", "name_id": "Merujuk", "name_en": "Refers to",
-                },
-            },
-        ]
-        related_works = [
-            {"id": 2, "frbr_uri": "/b", "title_id": "UU 2/2019", "number": "2",
-             "year": 2019, "status": "berlaku", "regulation_type_id": 1},
-            {"id": 3, "frbr_uri": "/c", "title_id": "PP 3/2018", "number": "3",
-             "year": 2018, "status": "berlaku", "regulation_type_id": 2},
-        ]
+    def test_rpc_called_with_type_id(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=self._status_payload())
 
-        server.sb.table.side_effect = self._make_router(
-            work, relationships, related_works,
-        )
+        get_law_status("pp", "5", 2021)
+        name, args = server.sb.rpc.call_args[0]
+        assert name == "get_law_status_full"
+        assert args == {"p_reg_type_id": 2, "p_number": "5", "p_year": 2021}
+
+    def test_amendments_vs_related(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=self._status_payload(
+            status="diubah",
+            date_enacted="2020-01-01",
+            amendments=[{
+                "relationship": "Amends", "relationship_id": "Mengubah",
+                "law": "UU 2/2019", "full_title": "UU 2/2019", "frbr_uri": "/b",
+            }],
+            related_laws=[{
+                "relationship": "Refers to", "relationship_id": "Merujuk",
+                "law": "PP 3/2018", "full_title": "PP 3/2018", "frbr_uri": "/c",
+            }],
+        ))
 
         result = get_law_status("UU", "1", 2020)
         assert len(result["amendments"]) == 1
         assert result["amendments"][0]["relationship"] == "Amends"
         assert len(result["related_laws"]) == 1
         assert result["related_laws"][0]["relationship"] == "Refers to"
+        assert result["amendments"][0]["law"] == "UU 2/2019"
+        assert result["related_laws"][0]["frbr_uri"] == "/c"
 
     def test_date_enacted_none(self, reg_cache):
-        work = {
-            "id": 1, "title_id": "T", "frbr_uri": "/a", "number": "1",
-            "year": 2020, "status": "berlaku", "regulation_type_id": 1,
-            "date_enacted": None,
-        }
-        server.sb.table.side_effect = self._make_router(work)
+        server.sb.rpc.return_value = _qm(data=self._status_payload())
 
         result = get_law_status("UU", "1", 2020)
         assert result["date_enacted"] is None
 
     def test_date_enacted_present(self, reg_cache):
-        work = {
-            "id": 1, "title_id": "T", "frbr_uri": "/a", "number": "1",
-            "year": 2020, "status": "berlaku", "regulation_type_id": 1,
-            "date_enacted": "2020-03-15",
-        }
-        server.sb.table.side_effect = self._make_router(work)
+        server.sb.rpc.return_value = _qm(data=self._status_payload(date_enacted="2020-03-15"))
 
         result = get_law_status("UU", "1", 2020)
         assert result["date_enacted"] == "2020-03-15"
 
+    def test_not_found_returns_error(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=None)
+        server.sb.table.side_effect = _route({"works": _qm(count=10)})
+
+        result = get_law_status("UU", "999", 2020)
+        assert "error" in result
+        assert "disclaimer" in result
+        assert server._status_cache.get("UU:999:2020") is None
+
+    def test_second_call_skips_db(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=self._status_payload())
+
+        result1 = get_law_status("uu", "1", 2020)
+        server.sb.reset_mock()
+        result2 = get_law_status("UU", "1", 2020)
+
+        assert result2 == result1
+        server.sb.rpc.assert_not_called()
+
 
 # ===================================================================
 # list_laws
@@ -323,32 +385,73 @@ class TestGetLawStatus:
 
 class TestListLaws:
 
+    @staticmethod
+    def _page(laws=None, total=0, next_cursor=None):
+        """Build a list_works_page() RPC payload."""
+        return {"total": total, "laws": laws or [], "next_cursor": next_cursor}
+
     def test_pagination_offset(self, reg_cache):
-        works_mock = _qm(data=[], count=25)
-        server.sb.table.side_effect = lambda n: works_mock if n == "works" else _qm()
+        server.sb.rpc.return_value = _qm(data=self._page(total=25))
 
         result = list_laws(page=2, per_page=10)
 
-        works_mock.range.assert_called_once_with(10, 19)
+        name, args = server.sb.rpc.call_args[0]
+        assert name == "list_works_page"
+        assert args["p_offset"] == 10
+        assert args["p_limit"] == 10
+        assert args["p_cursor_year"] is None
+        assert result["total"] == 25
         assert result["page"] == 2
         assert result["per_page"] == 10
+        server.sb.table.assert_not_called()
+
+    def test_cursor_uses_keyset_params(self, reg_cache):
+        laws = [
+            {"frbr_uri": f"/{i}", "title": "T", "regulation_type": "UU",
+             "number": str(i), "year": 2019, "status": "berlaku"}
+            for i in (9, 8)
+        ]
+        server.sb.rpc.return_value = _qm(data=self._page(laws, total=None, next_cursor="2019:8"))
+
+        result = list_laws(page=3, per_page=2, cursor="2020:42")
 
-    def test_search_produces_ilike(self, reg_cache):
-        works_mock = _qm(data=[], count=0)
-        server.sb.table.side_effect = lambda n: works_mock if n == "works" else _qm()
+        args = server.sb.rpc.call_args[0][1]
+        assert (args["p_cursor_year"], args["p_cursor_id"]) == (2020, 42)
+        assert args["p_offset"] == 0
+        assert result["laws"] == laws
+        assert result["next_cursor"] == "2019:8"
+        # The RPC only counts on cursor-less calls
+        assert result["total"] is None
 
-        list_laws(search="ketenagakerjaan")
+    def test_invalid_cursor_returns_error(self, reg_cache):
+        result = list_laws(cursor="garbage")
+        assert result["error"] == "Invalid cursor: garbage"
+        server.sb.rpc.assert_not_called()
 
-        works_mock.ilike.assert_called_once_with("title_id", "%ketenagakerjaan%")
+    def test_search_produces_escaped_pattern(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=self._page())
+
+        list_laws(search="100%_ketenagakerjaan")
+
+        args = server.sb.rpc.call_args[0][1]
+        assert args["p_title_pattern"] == r"%100\%\_ketenagakerjaan%"
+
+    def test_search_escapes_backslash(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=self._page())
+
+        list_laws(search="a\\b")
+
+        args = server.sb.rpc.call_args[0][1]
+        assert args["p_title_pattern"] == r"%a\\b%"
 
     def test_no_args_does_not_crash(self, reg_cache):
-        works_mock = _qm(data=[], count=0)
-        server.sb.table.side_effect = lambda n: works_mock if n == "works" else _qm()
+        server.sb.rpc.return_value = _qm(data=self._page())
 
         result = list_laws()
         assert "error" not in result
         assert result["total"] == 0
         assert result["laws"] == []
+        assert result["next_cursor"] is None
 
 
 # ===================================================================
@@ -359,15 +462,73 @@ class TestGetRegTypesCaching:
 
     def test_second_call_skips_db(self):
         reg_mock = _qm(data=[{"id": 1, "code": "UU"}])
-        server.sb.table.side_effect = lambda n: (
-            reg_mock if n == "regulation_types" else _qm()
-        )
+        server.sb.table.side_effect = _route({"regulation_types": reg_mock})
 
-        server._get_reg_types()
-        server._get_reg_types()
+        asyncio.run(server._get_reg_types())
+        asyncio.run(server._get_reg_types())
 
         # table() called only once — second call hits the cache
         assert server.sb.table.call_count == 1
+        assert server._reg_types["UU"] == 1
+        with pytest.raises(TypeError):
+            server._reg_types["PP"] = 2
+
+    def test_concurrent_cold_calls_load_once(self):
+        async def slow_execute():
+            await asyncio.sleep(0)
+            return MagicMock(data=[{"id": 1, "code": "UU"}])
+
+        reg_mock = _qm()
+        reg_mock.execute = AsyncMock(side_effect=slow_execute)
+        server.sb.table.side_effect = _route({"regulation_types": reg_mock})
+
+        async def burst():
+            await asyncio.gather(*(server._get_reg_types() for _ in range(5)))
+
+        asyncio.run(burst())
+        assert reg_mock.execute.await_count == 1
+
+    def test_refreshes_after_ttl(self):
+        reg_mock = _qm(data=[{"id": 1, "code": "UU"}])
+        server.sb.table.side_effect = _route({"regulation_types": reg_mock})
+
+        asyncio.run(server._get_reg_types())
+        server._reg_types_ts -= server._REG_TYPES_TTL + 1
+        reg_mock.execute.return_value = MagicMock(data=[{"id": 1, "code": "UU"}, {"id": 2, "code": "PP"}])
+        asyncio.run(server._get_reg_types())
+
+        assert reg_mock.execute.await_count == 2
+        assert server._reg_types_by_id[2] == "PP"
+
+    def test_failed_refresh_keeps_stale_maps(self):
+        reg_mock = _qm(data=[{"id": 1, "code": "UU"}])
+        server.sb.table.side_effect = _route({"regulation_types": reg_mock})
+
+        asyncio.run(server._get_reg_types())
+        server._reg_types_ts -= server._REG_TYPES_TTL + 1
+        reg_mock.execute.side_effect = Exception("DB down")
+        asyncio.run(server._get_reg_types())
+
+        assert server._reg_types["UU"] == 1
+
+
+class TestBootstrap:
+
+    def test_populates_reg_types_and_law_count(self):
+        server.sb.rpc.return_value = _qm(data={
+            "regulation_types": [{"id": 1, "code": "UU"}, {"id": 2, "code": "PP"}],
+            "law_count": 1234,
+        })
+
+        asyncio.run(server._bootstrap())
+
+        server.sb.rpc.assert_called_once_with("mcp_bootstrap", {})
+        assert server._reg_types == {"UU": 1, "PP": 2}
+        assert server._reg_types_by_id[2] == "PP"
+        assert asyncio.run(server._get_law_count()) == 1234
+        # Both caches are warm — neither loader touches the DB
+        asyncio.run(server._get_reg_types())
+        server.sb.table.assert_not_called()
 
 
 # ===================================================================
@@ -377,23 +538,20 @@ class TestGetRegTypesCaching:
 class TestDisclaimer:
 
     def test_search_laws_results_have_disclaimer(self, reg_cache):
-        server.sb.rpc.return_value.execute.return_value = MagicMock(data=[
-            {"work_id": 1, "content": "text", "score": 0.5, "metadata": {"pasal": "1"}},
-        ])
-        works_mock = _qm(data=[
-            {"id": 1, "frbr_uri": "/a", "title_id": "T", "number": "1",
-             "year": 2020, "status": "berlaku", "regulation_type_id": 1},
+        server.sb.rpc.return_value = _qm(data=[
+            {"work_id": 1, "content": "text", "score": 0.5,
+             "metadata": {"type": "UU", "number": "1", "year": "2020", "pasal": "1",
+                          "title_id": "T", "frbr_uri": "/a", "status": "berlaku"}},
         ])
-        server.sb.table.side_effect = lambda n: works_mock if n == "works" else _qm()
 
         result = search_laws("test")
         assert all("disclaimer" in r for r in result)
 
     def test_search_laws_no_results_has_disclaimer(self, reg_cache):
-        server.sb.rpc.return_value.execute.return_value = MagicMock(data=[])
+        server.sb.rpc.return_value = _qm(data=[])
         # _get_law_count needs works table
         count_mock = _qm(data=[], count=19)
-        server.sb.table.side_effect = lambda n: count_mock
+        server.sb.table.side_effect = _route({"works": count_mock})
 
         result = search_laws("nonexistent query")
         assert len(result) == 1
@@ -406,33 +564,25 @@ class TestDisclaimer:
     def test_get_pasal_has_disclaimer(self, reg_cache):
         work = {"id": 1, "title_id": "T", "frbr_uri": "/a", "number": "1",
                 "year": 2020, "status": "berlaku", "regulation_type_id": 1, "source_url": ""}
-        node = {"id": 10, "content_text": "Text", "parent_id": None, "number": "1", "node_type": "pasal"}
-
-        node_calls = iter([_qm(data=[node]), _qm(data=[])])
-        server.sb.table.side_effect = lambda n: (
-            _qm(data=[work]) if n == "works" else next(node_calls)
-        )
+        server.sb.rpc.return_value = _qm(data={
+            "work": work,
+            "pasal": {"content": "Text", "full_length": 4, "ayat": [], "chapter": None},
+        })
 
         result = get_pasal("UU", "1", 2020, "1")
         assert "disclaimer" in result
 
     def test_get_law_status_has_disclaimer(self, reg_cache):
-        work = {"id": 1, "title_id": "T", "frbr_uri": "/a", "number": "1",
-                "year": 2020, "status": "berlaku", "regulation_type_id": 1, "date_enacted": None}
-
-        works_calls = iter([_qm(data=[work]), _qm(data=[])])
-        server.sb.table.side_effect = lambda n: (
-            next(works_calls) if n == "works"
-            else _qm(data=[]) if n == "work_relationships"
-            else _qm()
-        )
+        server.sb.rpc.return_value = _qm(data={
+            "law_title": "T", "frbr_uri": "/a", "status": "berlaku", "date_enacted": None,
+            "amendments": [], "related_laws": [],
+        })
 
         result = get_law_status("UU", "1", 2020)
         assert "disclaimer" in result
 
     def test_list_laws_has_disclaimer(self, reg_cache):
-        works_mock = _qm(data=[], count=0)
-        server.sb.table.side_effect = lambda n: works_mock if n == "works" else _qm()
+        server.sb.rpc.return_value = _qm(data={"total": 0, "laws": [], "next_cursor": None})
 
         result = list_laws()
         assert "disclaimer" in result
@@ -445,6 +595,7 @@ class TestDisclaimer:
 class TestSearchLawsException:
 
     def test_rpc_exception_returns_error(self, reg_cache):
+        server.sb.rpc.return_value = _qm()
         server.sb.rpc.return_value.execute.side_effect = Exception("connection timeout")
 
         result = search_laws("test query")
@@ -463,12 +614,10 @@ class TestGetPasalNoParent:
     def test_parent_id_none_returns_empty_chapter(self, reg_cache):
         work = {"id": 1, "title_id": "T", "frbr_uri": "/a", "number": "1",
                 "year": 2020, "status": "berlaku", "regulation_type_id": 1, "source_url": ""}
-        node = {"id": 10, "content_text": "Text", "parent_id": None, "number": "5", "node_type": "pasal"}
-
-        node_calls = iter([_qm(data=[node]), _qm(data=[])])
-        server.sb.table.side_effect = lambda n: (
-            _qm(data=[work]) if n == "works" else next(node_calls)
-        )
+        server.sb.rpc.return_value = _qm(data={
+            "work": work,
+            "pasal": {"content": "Text", "full_length": 4, "ayat": [], "chapter": None},
+        })
 
         result = get_pasal("UU", "1", 2020, "5")
         assert result["chapter"] == ""
@@ -481,15 +630,11 @@ class TestGetPasalNoParent:
 class TestGetLawStatusNoRelationships:
 
     def test_no_relationships_returns_empty_lists(self, reg_cache):
-        work = {"id": 1, "title_id": "T", "frbr_uri": "/a", "number": "1",
-                "year": 2020, "status": "berlaku", "regulation_type_id": 1, "date_enacted": None}
-
-        works_calls = iter([_qm(data=[work]), _qm(data=[])])
-        server.sb.table.side_effect = lambda n: (
-            next(works_calls) if n == "works"
-            else _qm(data=[]) if n == "work_relationships"
-            else _qm()
-        )
+        # jsonb_agg over zero rows is NULL; the RPC coalesces, but guard anyway
+        server.sb.rpc.return_value = _qm(data={
+            "law_title": "T", "frbr_uri": "/a", "status": "berlaku", "date_enacted": None,
+            "amendments": None, "related_laws": None,
+        })
 
         result = get_law_status("UU", "1", 2020)
         assert result["amendments"] == []
@@ -503,36 +648,36 @@ class TestGetLawStatusNoRelationships:
 class TestListLawsFilters:
 
     def test_all_filters(self, reg_cache):
-        works_mock = _qm(data=[
-            {"frbr_uri": "/a", "title_id": "T", "number": "1", "year": 2020,
-             "status": "berlaku", "regulation_types": {"code": "UU", "name_id": "Undang-Undang"}},
-        ], count=1)
-        server.sb.table.side_effect = lambda n: works_mock if n == "works" else _qm()
+        server.sb.rpc.return_value = _qm(data={
+            "total": 1, "next_cursor": None,
+            "laws": [{"frbr_uri": "/a", "title": "T", "regulation_type": "UU",
+                      "number": "1", "year": 2020, "status": "berlaku"}],
+        })
 
         result = list_laws(regulation_type="UU", year=2020, status="berlaku", search="test")
 
         assert result["total"] == 1
         assert len(result["laws"]) == 1
-        works_mock.eq.assert_any_call("regulation_type_id", 1)
-        works_mock.eq.assert_any_call("year", 2020)
-        works_mock.eq.assert_any_call("status", "berlaku")
-        works_mock.ilike.assert_called_once_with("title_id", "%test%")
+        args = server.sb.rpc.call_args[0][1]
+        assert args["p_reg_type_id"] == 1
+        assert args["p_year"] == 2020
+        assert args["p_status"] == "berlaku"
+        assert args["p_title_pattern"] == "%test%"
 
     def test_type_only_filter(self, reg_cache):
-        works_mock = _qm(data=[], count=0)
-        server.sb.table.side_effect = lambda n: works_mock if n == "works" else _qm()
+        server.sb.rpc.return_value = _qm(data=None)
 
         result = list_laws(regulation_type="PP")
         assert "error" not in result
-        works_mock.eq.assert_any_call("regulation_type_id", 2)
+        args = server.sb.rpc.call_args[0][1]
+        assert args["p_reg_type_id"] == 2
+        assert args["p_year"] is None
 
-    def test_year_only_filter(self, reg_cache):
-        works_mock = _qm(data=[], count=0)
-        server.sb.table.side_effect = lambda n: works_mock if n == "works" else _qm()
+    def test_unknown_type_is_not_filtered(self, reg_cache):
+        server.sb.rpc.return_value = _qm(data=None)
 
-        result = list_laws(year=2023)
-        assert "error" not in result
-        works_mock.eq.assert_any_call("year", 2023)
+        list_laws(regulation_type="FAKE")
+        assert server.sb.rpc.call_args[0][1]["p_reg_type_id"] is None
 
 
 # ===================================================================
@@ -543,12 +688,49 @@ class TestNoResultsMessage:
 
     def test_includes_law_count(self, reg_cache):
         count_mock = _qm(data=[], count=19)
-        server.sb.table.side_effect = lambda n: count_mock
+        server.sb.table.side_effect = _route({"works": count_mock})
 
-        msg = server._no_results_message("'test'")
+        msg = asyncio.run(server._no_results_message("'test'"))
         assert "19" in msg
         assert "does NOT mean" in msg.lower() or "does NOT" in msg
 
+    def test_failed_count_refresh_keeps_last_count(self, reg_cache):
+        count_mock = _qm(count=19)
+        server.sb.table.side_effect = _route({"works": count_mock})
+        asyncio.run(server._get_law_count())
+
+        server._law_count_ts -= server._LAW_COUNT_TTL + 1
+        count_mock.execute.side_effect = Exception("down")
+        assert asyncio.run(server._get_law_count()) == 19
+
+
+# ===================================================================
+# Cross-reference extraction
+# ===================================================================
+
+class TestExtractCrossReferences:
+
+    def test_full_reference(self):
+        text = "sebagaimana dimaksud dalam Pasal 5 ayat (2) huruf a UU Nomor 13 Tahun 2003"
+        assert server.extract_cross_references(text) == [{
+            "pasal": "5", "ayat": "2", "huruf": "a",
+            "law_number": "13", "law_year": 2003,
+        }]
+
+    def test_letter_suffix_and_dedup(self):
+        text = "Pasal 81A dan pasal 81A serta Pasal 7 ayat (1)"
+        assert server.extract_cross_references(text) == [
+            {"pasal": "81A"},
+            {"pasal": "7", "ayat": "1"},
+        ]
+
+    def test_malformed_suffix_ignored(self):
+        assert server.extract_cross_references("Pasal 3 ayat huruf") == [{"pasal": "3"}]
+
+    def test_nbsp_separators(self):
+        text = "Pasal\xa05 ayat\xa0(2)"
+        assert server.extract_cross_references(text) == [{"pasal": "5", "ayat": "2"}]
+
 
 # ===================================================================
 # TTL Cache tests
@@ -572,6 +754,16 @@ class TestTTLCache:
         _time.sleep(1.1)
         assert cache.get("key1") is None
 
+    def test_evicts_least_recently_used(self):
+        cache = server.TTLCache(ttl_seconds=60, maxsize=2)
+        cache.set("k1", "v1")
+        cache.set("k2", "v2")
+        cache.get("k1")
+        cache.set("k3", "v3")
+        assert cache.get("k2") is None
+        assert cache.get("k1") == "v1"
+        assert cache.get("k3") == "v3"
+
     def test_clear(self):
         cache = server.TTLCache(ttl_seconds=60)
         cache.set("k1", "v1")
@@ -590,12 +782,10 @@ class TestPasalCaching:
     def test_second_call_skips_db(self, reg_cache):
         work = {"id": 1, "title_id": "T", "frbr_uri": "/a", "number": "1",
                 "year": 2020, "status": "berlaku", "regulation_type_id": 1, "source_url": ""}
-        node = {"id": 10, "content_text": "Text", "parent_id": None, "number": "5", "node_type": "pasal"}
-
-        node_calls = iter([_qm(data=[node]), _qm(data=[])])
-        server.sb.table.side_effect = lambda n: (
-            _qm(data=[work]) if n == "works" else next(node_calls)
-        )
+        server.sb.rpc.return_value = _qm(data={
+            "work": work,
+            "pasal": {"content": "Text", "full_length": 4, "ayat": [], "chapter": None},
+        })
 
         result1 = get_pasal("UU", "1", 2020, "5")
         assert "error" not in result1
@@ -605,8 +795,11 @@ class TestPasalCaching:
 
         result2 = get_pasal("UU", "1", 2020, "5")
         assert result2 == result1
+        # The cached payload itself is stored without the disclaimer
+        assert "disclaimer" not in orjson.loads(server._pasal_cache.get("UU:1:2020:5"))
         # DB should NOT have been called
         server.sb.table.assert_not_called()
+        server.sb.rpc.assert_not_called()
 
 
 # ===================================================================
@@ -636,13 +829,114 @@ class TestRateLimiter:
         rl.reset()
         assert rl.check() is None
 
+    def test_tokens_refill_over_window(self):
+        with patch.object(server.time, "monotonic_ns", return_value=1000 * 10**9):
+            rl = server.RateLimiter(2, window_seconds=60)
+            rl.check()
+            rl.check()
+            assert rl.check() == 30
+        with patch.object(server.time, "monotonic_ns", return_value=1030 * 10**9):
+            assert rl.check() is None
+            assert rl.check() == 30
+        with patch.object(server.time, "monotonic_ns", return_value=1200 * 10**9):
+            # Refill is capped at the bucket capacity
+            assert rl.check() is None
+            assert rl.check() is None
+            assert rl.check() is not None
+
     def test_search_laws_rate_limited(self, reg_cache):
         # Fill up the limiter
         limiter = server._rate_limiters["search_laws"]
         for _ in range(30):
             limiter.check()
 
-        server.sb.rpc.return_value.execute.return_value = MagicMock(data=[])
+        server.sb.rpc.return_value = _qm(data=[])
         result = search_laws("test")
         assert isinstance(result, list)
         assert result[0].get("error") == "Rate limit exceeded"
+
+
+# ===================================================================
+# Supabase retry transport
+# ===================================================================
+
+class TestRetryTransport:
+
+    @staticmethod
+    def _send(responses, **kwargs):
+        """Send one request through _RetryTransport over a scripted inner transport."""
+        calls = []
+
+        def handler(request):
+            item = responses[len(calls)]
+            calls.append(request)
+            if isinstance(item, Exception):
+                raise item
+            return item
+
+        transport = server._RetryTransport(httpx.MockTransport(handler), **kwargs)
+
+        async def run():
+            with patch.object(server.asyncio, "sleep", new=AsyncMock()) as sleep:
+                request = httpx.Request("POST", "https://db.example/rest/v1/rpc/f", json={})
+                response = await transport.handle_async_request(request)
+                return response, sleep
+
+        response, sleep = asyncio.run(run())
+        return response, sleep, calls
+
+    def test_retries_transient_status_then_succeeds(self):
+        response, sleep, calls = self._send([httpx.Response(503), httpx.Response(200)])
+        assert response.status_code == 200
+        assert len(calls) == 2
+        sleep.assert_awaited_once()
+
+    def test_client_error_not_retried(self):
+        response, sleep, calls = self._send([httpx.Response(400)])
+        assert response.status_code == 400
+        assert len(calls) == 1
+        sleep.assert_not_awaited()
+
+    def test_gives_up_after_attempts(self):
+        response, _, calls = self._send([httpx.Response(502)] * 3, attempts=3)
+        assert response.status_code == 502
+        assert len(calls) == 3
+
+    def test_honors_retry_after(self):
+        response, sleep, _ = self._send(
+            [httpx.Response(429, headers={"Retry-After": "1"}), httpx.Response(200)]
+        )
+        assert response.status_code == 200
+        sleep.assert_awaited_once_with(1.0)
+
+    def test_long_retry_after_returned_without_waiting(self):
+        response, sleep, calls = self._send([httpx.Response(429, headers={"Retry-After": "60"})])
+        assert response.status_code == 429
+        assert len(calls) == 1
+        sleep.assert_not_awaited()
+
+    def test_connect_error_retried(self):
+        response, _, calls = self._send([httpx.ConnectError("refused"), httpx.Response(200)])
+        assert response.status_code == 200
+        assert len(calls) == 2
+
+
+# ===================================================================
+# ping
+# ===================================================================
+
+class TestPing:
+
+    def test_healthy(self, reg_cache):
+        server.sb.table.side_effect = _route({"works": _qm(count=42)})
+        assert "42 laws" in ping()
+
+    def test_unloaded_reg_types_reported(self):
+        server.sb.table.side_effect = _route({"works": _qm(count=42)})
+        assert "regulation types are not loaded" in ping()
+
+    def test_db_failure(self, reg_cache):
+        q = _qm()
+        q.execute.side_effect = Exception("down")
+        server.sb.table.side_effect = _route({"works": q})
+        assert "database connection failed" in ping()
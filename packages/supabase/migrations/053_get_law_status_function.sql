@@ -0,0 +1,64 @@
+-- Migration 053: get_law_status_full() RPC
+-- The MCP server's get_law_status tool used to look up the work, then its
+-- relationships, then the related works — three sequential PostgREST
+-- roundtrips per cache miss. This function does the whole lookup in one
+-- query and returns the response payload as JSONB, with relationships
+-- already split into amendments vs related laws.
+--
+-- Returns NULL when no work matches (type, number, year).
+
+CREATE OR REPLACE FUNCTION get_law_status_full(
+    p_reg_type_id INT,
+    p_number TEXT,
+    p_year INT
+)
+RETURNS jsonb
+LANGUAGE sql STABLE
+SET search_path = 'public', 'extensions'
+AS $$
+  WITH w AS (
+    SELECT id, title_id, frbr_uri, status, date_enacted
+    FROM works
+    WHERE regulation_type_id = p_reg_type_id
+      AND number = p_number
+      AND year = p_year
+    LIMIT 1
+  ),
+  rels AS (
+    SELECT
+      r.id AS rel_id,
+      CASE
+        WHEN rt.code IN ('mengubah', 'diubah_oleh', 'mencabut', 'dicabut_oleh') THEN 'amendment'
+        ELSE 'related'
+      END AS bucket,
+      jsonb_build_object(
+        'relationship', rt.name_en,
+        'relationship_id', rt.name_id,
+        'law', concat(ort.code, ' ', o.number, '/', o.year),
+        'full_title', o.title_id,
+        'frbr_uri', o.frbr_uri
+      ) AS entry
+    FROM w
+    JOIN work_relationships r
+      ON r.source_work_id = w.id OR r.target_work_id = w.id
+    JOIN relationship_types rt ON rt.id = r.relationship_type_id
+    JOIN works o
+      ON o.id = CASE WHEN r.source_work_id = w.id THEN r.target_work_id ELSE r.source_work_id END
+    LEFT JOIN regulation_types ort ON ort.id = o.regulation_type_id
+  )
+  SELECT jsonb_build_object(
+    'law_title', w.title_id,
+    'frbr_uri', w.frbr_uri,
+    'status', w.status,
+    'date_enacted', w.date_enacted::text,
+    'amendments', COALESCE(
+      (SELECT jsonb_agg(entry ORDER BY rel_id) FROM rels WHERE bucket = 'amendment'),
+      '[]'::jsonb
+    ),
+    'related_laws', COALESCE(
+      (SELECT jsonb_agg(entry ORDER BY rel_id) FROM rels WHERE bucket = 'related'),
+      '[]'::jsonb
+    )
+  )
+  FROM w;
+$$;
@@ -0,0 +1,424 @@
+-- Migration 054: Push year range filter into search_legal_chunks() + return work metadata
+--
+-- The MCP server's search_laws over-fetched (match_count = limit * 3), filtered
+-- year_from/year_to in Python, then made a second request to `works` for
+-- title/frbr_uri/status, and the language filter was ignored. All are now
+-- handled in SQL:
+--   1. metadata_filter accepts 'year_from' and 'year_to' (INT, inclusive) in
+--      addition to 'year', applied inside all 3 layers so LIMIT match_count
+--      returns only rows the caller will keep.
+--   2. metadata JSONB gains 'title_id', 'frbr_uri' and 'status' from the
+--      already-joined works row, so callers don't need a follow-up lookup.
+--   3. metadata_filter 'language' (sent by search_laws for non-Indonesian
+--      searches but never read) is matched against document_nodes.language
+--      (migration 009) in all 3 layers: the representative node for Layers
+--      1-2 and the content candidates for Layer 3.
+--
+-- Content FTS already uses the GIN index on document_nodes.fts (idx_nodes_fts);
+-- no new index needed. Same signature and return columns — existing consumers
+-- ignore the extra metadata keys.
+
+DROP FUNCTION IF EXISTS search_legal_chunks(TEXT, INT, JSONB);
+
+CREATE FUNCTION search_legal_chunks(
+    query_text TEXT,
+    match_count INT DEFAULT 10,
+    metadata_filter JSONB DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (
+    id BIGINT,
+    work_id INTEGER,
+    content TEXT,
+    metadata JSONB,
+    score FLOAT,
+    snippet TEXT
+)
+LANGUAGE plpgsql
+STABLE
+SET search_path = 'public', 'extensions'
+AS $$
+DECLARE
+    v_safe TEXT;
+    v_type_filter TEXT;
+    v_year_filter INT := CASE WHEN metadata_filter ? 'year'
+        THEN (metadata_filter ->> 'year')::int ELSE NULL END;
+    v_year_from INT := CASE WHEN metadata_filter ? 'year_from'
+        THEN (metadata_filter ->> 'year_from')::int ELSE NULL END;
+    v_year_to INT := CASE WHEN metadata_filter ? 'year_to'
+        THEN (metadata_filter ->> 'year_to')::int ELSE NULL END;
+    v_status_filter TEXT := metadata_filter ->> 'status';
+    v_language TEXT := metadata_filter ->> 'language';
+    v_type_id INTEGER;
+    v_first_word TEXT;
+    v_second_word TEXT;
+    v_nums TEXT[];
+    v_count INTEGER := 0;
+    v_total INTEGER := 0;
+    v_tsquery TSQUERY;
+    v_node_types TEXT[] := ARRAY[
+        'pasal','ayat','preamble','content',
+        'aturan','penjelasan_umum','penjelasan_pasal'
+    ];
+BEGIN
+    v_type_filter := metadata_filter ->> 'type';
+
+    -- Sanitize: strip all non-alphanumeric/non-space chars, collapse whitespace.
+    v_safe := regexp_replace(query_text, '[^a-zA-Z0-9 ]', ' ', 'g');
+    v_safe := trim(regexp_replace(v_safe, '\s+', ' ', 'g'));
+
+    IF v_safe = '' THEN RETURN; END IF;
+
+    -- ================================================================
+    -- Layer 1: Identity fast path — deterministic regulation lookup
+    -- ================================================================
+
+    v_first_word := UPPER(split_part(v_safe, ' ', 1));
+    v_second_word := UPPER(COALESCE(NULLIF(split_part(v_safe, ' ', 2), ''), ''));
+
+    -- 1a. Try code match
+    SELECT rt.id INTO v_type_id
+    FROM regulation_types rt
+    WHERE rt.code IN (
+        v_first_word,
+        v_first_word || '_' || v_second_word,
+        CASE WHEN v_first_word = 'PERPU' THEN 'PERPPU' ELSE NULL END
+    )
+    ORDER BY CASE rt.code
+        WHEN v_first_word THEN 1
+        WHEN v_first_word || '_' || v_second_word THEN 2
+        ELSE 3
+    END
+    LIMIT 1;
+
+    -- 1b. If no code match, try name_id prefix
+    IF v_type_id IS NULL THEN
+        SELECT sub.type_id INTO v_type_id
+        FROM (
+            SELECT rt.id AS type_id,
+                   trim(regexp_replace(
+                       regexp_replace(LOWER(rt.name_id), '[^a-z0-9 ]', ' ', 'g'),
+                       '\s+', ' ', 'g'
+                   )) AS norm
+            FROM regulation_types rt
+        ) sub
+        WHERE LOWER(v_safe) LIKE sub.norm || ' %'
+           OR LOWER(v_safe) = sub.norm
+        ORDER BY length(sub.norm) DESC
+        LIMIT 1;
+    END IF;
+
+    -- 1c. If we found a regulation type, extract numbers and do direct lookup
+    IF v_type_id IS NOT NULL THEN
+        SELECT array_agg(m[1]::text) INTO v_nums
+        FROM regexp_matches(v_safe, '(\d+)', 'g') m;
+
+        IF v_nums IS NOT NULL AND array_length(v_nums, 1) > 0 THEN
+            RETURN QUERY
+            SELECT
+                dn_rep.id::bigint,
+                w.id,
+                dn_rep.content_text,
+                jsonb_build_object(
+                    'type', rt.code,
+                    'number', w.number,
+                    'year', w.year::text,
+                    'pasal', dn_rep.node_number,
+                    'title_id', w.title_id,
+                    'frbr_uri', w.frbr_uri,
+                    'status', w.status
+                ),
+                1000.0::float,
+                LEFT(dn_rep.content_text, 200)
+            FROM works w
+            JOIN regulation_types rt ON rt.id = w.regulation_type_id
+            JOIN LATERAL (
+                SELECT d.id, d.content_text, d.number AS node_number
+                FROM document_nodes d
+                WHERE d.work_id = w.id
+                  AND d.content_text IS NOT NULL
+                  AND d.node_type = ANY(v_node_types)
+                  AND (v_language IS NULL OR d.language = v_language)
+                ORDER BY d.sort_order ASC NULLS LAST
+                LIMIT 1
+            ) dn_rep ON true
+            WHERE w.regulation_type_id = v_type_id
+              AND (
+                  (array_length(v_nums, 1) >= 2 AND (
+                      (w.number = v_nums[1]
+                       AND length(v_nums[2]) <= 4
+                       AND w.year = v_nums[2]::int)
+                      OR
+                      (w.number = v_nums[2]
+                       AND length(v_nums[1]) <= 4
+                       AND w.year = v_nums[1]::int)
+                  ))
+                  OR
+                  (array_length(v_nums, 1) = 1 AND (
+                      w.number = v_nums[1]
+                      OR (length(v_nums[1]) <= 4 AND w.year = v_nums[1]::int)
+                  ))
+              )
+              AND (v_type_filter IS NULL OR rt.code = v_type_filter)
+              AND (v_year_filter IS NULL OR w.year = v_year_filter)
+              AND (v_year_from IS NULL OR w.year >= v_year_from)
+              AND (v_year_to IS NULL OR w.year <= v_year_to)
+              AND (v_status_filter IS NULL OR w.status = v_status_filter)
+            LIMIT 3;
+
+            GET DIAGNOSTICS v_count = ROW_COUNT;
+            v_total := v_total + v_count;
+
+            -- Early exit: identity match is definitive
+            IF v_count > 0 THEN RETURN; END IF;
+        END IF;
+    END IF;
+
+    -- ================================================================
+    -- Layer 2: Works FTS — title / subject / metadata search
+    -- ================================================================
+
+    RETURN QUERY
+    SELECT
+        dn_rep.id::bigint,
+        w.id,
+        dn_rep.content_text,
+        jsonb_build_object(
+            'type', rt.code,
+            'number', w.number,
+            'year', w.year::text,
+            'pasal', dn_rep.node_number,
+            'title_id', w.title_id,
+            'frbr_uri', w.frbr_uri,
+            'status', w.status
+        ),
+        (
+            ts_rank_cd(w.search_fts, plainto_tsquery('indonesian', v_safe))
+            * 10.0
+            * (1.0 + (10 - COALESCE(rt.hierarchy_level, 5)) * 0.05)
+        )::float,
+        LEFT(dn_rep.content_text, 200)
+    FROM works w
+    JOIN regulation_types rt ON rt.id = w.regulation_type_id
+    JOIN LATERAL (
+        SELECT d.id, d.content_text, d.number AS node_number
+        FROM document_nodes d
+        WHERE d.work_id = w.id
+          AND d.content_text IS NOT NULL
+          AND d.node_type = ANY(v_node_types)
+          AND (v_language IS NULL OR d.language = v_language)
+        ORDER BY d.sort_order ASC NULLS LAST
+        LIMIT 1
+    ) dn_rep ON true
+    WHERE w.search_fts @@ plainto_tsquery('indonesian', v_safe)
+      AND (v_type_filter IS NULL OR rt.code = v_type_filter)
+      AND (v_year_filter IS NULL OR w.year = v_year_filter)
+      AND (v_year_from IS NULL OR w.year >= v_year_from)
+      AND (v_year_to IS NULL OR w.year <= v_year_to)
+      AND (v_status_filter IS NULL OR w.status = v_status_filter)
+    ORDER BY 5 DESC
+    LIMIT 5;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    v_total := v_total + v_count;
+
+    -- Early exit: if works FTS found enough, skip content scan
+    IF v_total >= match_count THEN RETURN; END IF;
+
+    -- ================================================================
+    -- Layer 3: Content FTS — search within document_nodes
+    -- Uses CTE pattern: rank first, then ts_headline only on top results.
+    -- Candidate cap (500) bounds work regardless of total matches.
+    -- ================================================================
+
+    -- Tier 1: websearch_to_tsquery
+    v_tsquery := NULL;
+    BEGIN
+        v_tsquery := websearch_to_tsquery('indonesian', v_safe);
+    EXCEPTION WHEN OTHERS THEN
+        v_tsquery := NULL;
+    END;
+
+    IF v_tsquery IS NOT NULL THEN
+        RETURN QUERY
+        WITH candidates AS (
+            SELECT
+                dn.id,
+                dn.work_id,
+                dn.content_text,
+                dn.fts,
+                dn.number AS node_number,
+                w.year AS w_year,
+                w.number AS w_number,
+                w.title_id AS w_title_id,
+                w.frbr_uri AS w_frbr_uri,
+                w.status AS w_status,
+                rt.code AS rt_code,
+                rt.hierarchy_level AS rt_level
+            FROM document_nodes dn
+            JOIN works w ON w.id = dn.work_id
+            JOIN regulation_types rt ON rt.id = w.regulation_type_id
+            WHERE dn.fts @@ v_tsquery
+                AND dn.node_type = ANY(v_node_types)
+                AND (v_language IS NULL OR dn.language = v_language)
+                AND dn.content_text IS NOT NULL
+                AND (v_type_filter IS NULL OR rt.code = v_type_filter)
+                AND (v_year_filter IS NULL OR w.year = v_year_filter)
+                AND (v_year_from IS NULL OR w.year >= v_year_from)
+                AND (v_year_to IS NULL OR w.year <= v_year_to)
+                AND (v_status_filter IS NULL OR w.status = v_status_filter)
+            LIMIT 500
+        ),
+        ranked AS (
+            SELECT
+                c.*,
+                (
+                    ts_rank_cd(c.fts, v_tsquery)
+                    * (1.0 + (10 - COALESCE(c.rt_level, 5)) * 0.05)
+                    * (1.0 + GREATEST(0, COALESCE(c.w_year, 2000) - 1990) * 0.005)
+                )::float AS final_score
+            FROM candidates c
+            ORDER BY final_score DESC
+            LIMIT match_count
+        )
+        SELECT
+            r.id::bigint,
+            r.work_id,
+            r.content_text,
+            jsonb_build_object(
+                'type', r.rt_code,
+                'number', r.w_number,
+                'year', r.w_year::text,
+                'pasal', r.node_number,
+                'title_id', r.w_title_id,
+                'frbr_uri', r.w_frbr_uri,
+                'status', r.w_status
+            ),
+            r.final_score,
+            ts_headline('indonesian', LEFT(r.content_text, 1000), v_tsquery,
+                'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=1')
+        FROM ranked r
+        ORDER BY r.final_score DESC;
+
+        GET DIAGNOSTICS v_count = ROW_COUNT;
+    END IF;
+
+    IF v_count = 0 THEN
+        -- Tier 2: plainto_tsquery
+        v_tsquery := plainto_tsquery('indonesian', v_safe);
+
+        RETURN QUERY
+        WITH candidates AS (
+            SELECT
+                dn.id,
+                dn.work_id,
+                dn.content_text,
+                dn.fts,
+                dn.number AS node_number,
+                w.year AS w_year,
+                w.number AS w_number,
+                w.title_id AS w_title_id,
+                w.frbr_uri AS w_frbr_uri,
+                w.status AS w_status,
+                rt.code AS rt_code,
+                rt.hierarchy_level AS rt_level
+            FROM document_nodes dn
+            JOIN works w ON w.id = dn.work_id
+            JOIN regulation_types rt ON rt.id = w.regulation_type_id
+            WHERE dn.fts @@ v_tsquery
+                AND dn.node_type = ANY(v_node_types)
+                AND (v_language IS NULL OR dn.language = v_language)
+                AND dn.content_text IS NOT NULL
+                AND (v_type_filter IS NULL OR rt.code = v_type_filter)
+                AND (v_year_filter IS NULL OR w.year = v_year_filter)
+                AND (v_year_from IS NULL OR w.year >= v_year_from)
+                AND (v_year_to IS NULL OR w.year <= v_year_to)
+                AND (v_status_filter IS NULL OR w.status = v_status_filter)
+            LIMIT 500
+        ),
+        ranked AS (
+            SELECT
+                c.*,
+                (
+                    ts_rank_cd(c.fts, v_tsquery)
+                    * (1.0 + (10 - COALESCE(c.rt_level, 5)) * 0.05)
+                    * (1.0 + GREATEST(0, COALESCE(c.w_year, 2000) - 1990) * 0.005)
+                )::float AS final_score
+            FROM candidates c
+            ORDER BY final_score DESC
+            LIMIT match_count
+        )
+        SELECT
+            r.id::bigint,
+            r.work_id,
+            r.content_text,
+            jsonb_build_object(
+                'type', r.rt_code,
+                'number', r.w_number,
+                'year', r.w_year::text,
+                'pasal', r.node_number,
+                'title_id', r.w_title_id,
+                'frbr_uri', r.w_frbr_uri,
+                'status', r.w_status
+            ),
+            r.final_score,
+            ts_headline('indonesian', LEFT(r.content_text, 1000), v_tsquery,
+                'StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=1')
+        FROM ranked r
+        ORDER BY r.final_score DESC;
+
+        GET DIAGNOSTICS v_count = ROW_COUNT;
+    END IF;
+
+    IF v_count = 0 THEN
+        -- Tier 3: ILIKE fallback (last resort, capped at 200 candidates)
+        RETURN QUERY
+        WITH candidates AS (
+            SELECT
+                dn.id,
+                dn.work_id,
+                dn.content_text,
+                dn.number AS node_number,
+                w.year AS w_year,
+                w.number AS w_number,
+                w.title_id AS w_title_id,
+                w.frbr_uri AS w_frbr_uri,
+                w.status AS w_status,
+                rt.code AS rt_code
+            FROM document_nodes dn
+            JOIN works w ON w.id = dn.work_id
+            JOIN regulation_types rt ON rt.id = w.regulation_type_id
+            WHERE (
+                SELECT bool_and(dn.content_text ILIKE '%' || word || '%')
+                FROM unnest(string_to_array(v_safe, ' ')) AS word
+                WHERE length(word) > 2
+            )
+                AND dn.node_type = ANY(v_node_types)
+                AND (v_language IS NULL OR dn.language = v_language)
+                AND dn.content_text IS NOT NULL
+                AND (v_type_filter IS NULL OR rt.code = v_type_filter)
+                AND (v_year_filter IS NULL OR w.year = v_year_filter)
+                AND (v_year_from IS NULL OR w.year >= v_year_from)
+                AND (v_year_to IS NULL OR w.year <= v_year_to)
+                AND (v_status_filter IS NULL OR w.status = v_status_filter)
+            LIMIT 200
+        )
+        SELECT
+            c.id::bigint,
+            c.work_id,
+            c.content_text,
+            jsonb_build_object(
+                'type', c.rt_code,
+                'number', c.w_number,
+                'year', c.w_year::text,
+                'pasal', c.node_number,
+                'title_id', c.w_title_id,
+                'frbr_uri', c.w_frbr_uri,
+                'status', c.w_status
+            ),
+            0.01::float,
+            LEFT(c.content_text, 200)
+        FROM candidates c
+        LIMIT match_count;
+    END IF;
+END;
+$$;
@@ -0,0 +1,49 @@
+-- Migration 055: get_pasal_bundle() RPC
+-- The MCP server's get_pasal tool fetched the pasal node (full content_text,
+-- even though it only returns the first 3000 chars), then its ayat children,
+-- then the parent BAB heading. This function returns all three in one query
+-- and truncates server-side.
+--
+-- 'content' is the first p_max_len chars. For longer articles 'tail' holds
+-- the rest (NULL otherwise): the caller only uses it to extract
+-- cross-references, so references past the cut are not lost.
+--
+-- Returns NULL when the work has no pasal with that number.
+
+CREATE OR REPLACE FUNCTION get_pasal_bundle(
+    p_work_id INT,
+    p_pasal_number TEXT,
+    p_max_len INT DEFAULT 3000
+)
+RETURNS jsonb
+LANGUAGE sql STABLE
+SET search_path = 'public', 'extensions'
+AS $$
+  SELECT jsonb_build_object(
+    'content', LEFT(n.content_text, p_max_len),
+    'tail', CASE WHEN length(n.content_text) > p_max_len
+                 THEN SUBSTRING(n.content_text FROM p_max_len + 1) END,
+    'full_length', COALESCE(length(n.content_text), 0),
+    'ayat', COALESCE((
+      SELECT jsonb_agg(
+        jsonb_build_object('number', a.number, 'text', a.content_text)
+        ORDER BY a.sort_order
+      )
+      FROM document_nodes a
+      WHERE a.work_id = n.work_id
+        AND a.parent_id = n.id
+        AND a.node_type = 'ayat'
+    ), '[]'::jsonb),
+    'chapter', (
+      SELECT jsonb_build_object('node_type', p.node_type, 'number', p.number, 'heading', p.heading)
+      FROM document_nodes p
+      WHERE p.id = n.parent_id
+    )
+  )
+  FROM document_nodes n
+  WHERE n.work_id = p_work_id
+    AND n.node_type = 'pasal'
+    AND n.number = p_pasal_number
+  ORDER BY n.sort_order
+  LIMIT 1;
+$$;
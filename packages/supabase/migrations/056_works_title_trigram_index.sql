@@ -0,0 +1,10 @@
+-- Migration 056: Trigram index on works.title_id
+-- list_laws(search=...) filters with title_id ILIKE '%term%'. A leading
+-- wildcard can't use a btree index, so every title search was a sequential
+-- scan of works. A pg_trgm GIN index lets Postgres serve ILIKE '%term%' from
+-- the index (for terms of 3+ characters).
+--
+-- pg_trgm lives in the extensions schema since migration 049.
+
+CREATE INDEX IF NOT EXISTS idx_works_title_trgm
+    ON works USING GIN (title_id extensions.gin_trgm_ops);
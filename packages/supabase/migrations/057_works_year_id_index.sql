@@ -0,0 +1,7 @@
+-- Migration 057: Composite (year, id) index for list_laws keyset pagination
+-- list_laws pages with ORDER BY year DESC, id DESC and, given a cursor,
+-- WHERE (year, id) < (cursor_year, cursor_id). idx_works_year alone can't
+-- satisfy the id tie-break, so deep pages still sorted every row of a year.
+-- A btree on (year, id) is scanned backwards for the DESC order.
+
+CREATE INDEX IF NOT EXISTS idx_works_year_id ON works (year, id);
@@ -0,0 +1,37 @@
+-- Migration 058: get_pasal_full() RPC
+-- The MCP server's get_pasal tool still made two sequential roundtrips per
+-- cache miss: a `works` lookup by (type, number, year), then
+-- get_pasal_bundle() with the resulting work id. This function resolves the
+-- work and builds the bundle in one query.
+--
+-- Returns NULL when no work matches (type, number, year). Otherwise returns
+-- {work: {...}, pasal: <get_pasal_bundle() payload or NULL>} so the caller can
+-- tell "law not found" from "article not found".
+
+CREATE OR REPLACE FUNCTION get_pasal_full(
+    p_reg_type_id INT,
+    p_number TEXT,
+    p_year INT,
+    p_pasal_number TEXT,
+    p_max_len INT DEFAULT 3000
+)
+RETURNS jsonb
+LANGUAGE sql STABLE
+SET search_path = 'public', 'extensions'
+AS $$
+  SELECT jsonb_build_object(
+    'work', jsonb_build_object(
+      'id', w.id,
+      'title_id', w.title_id,
+      'frbr_uri', w.frbr_uri,
+      'status', w.status,
+      'source_url', w.source_url
+    ),
+    'pasal', get_pasal_bundle(w.id, p_pasal_number, p_max_len)
+  )
+  FROM works w
+  WHERE w.regulation_type_id = p_reg_type_id
+    AND w.number = p_number
+    AND w.year = p_year
+  LIMIT 1;
+$$;
@@ -0,0 +1,75 @@
+-- Migration 059: list_works_page() RPC
+-- The MCP server's list_laws tool queried `works` with count=exact, so
+-- PostgREST ran the filtered SELECT for the page and a separate count(*) over
+-- the same filters in every request, including deep keyset pages. This
+-- function returns the page rows already shaped for the tool response, the
+-- keyset cursor for the next page, and the total only when it is needed.
+--
+-- NULL parameters mean "no filter". p_title_pattern is an ILIKE pattern with
+-- the caller's % and _ already escaped; it is served by idx_works_title_trgm
+-- (migration 056). When p_cursor_year/p_cursor_id are set, only rows with
+-- (year, id) below the cursor are returned and p_offset should be 0.
+--
+-- The page is read straight off idx_works_year_id (migration 057): the cursor
+-- predicate is always a row comparison (a sentinel above every real row when
+-- no cursor is given), so it stays an index condition and a deep page costs
+-- O(p_limit). `total` counts the whole filter, ignoring the cursor, and is only
+-- computed on cursor-less calls; it is NULL when p_cursor_year is set.
+
+CREATE OR REPLACE FUNCTION list_works_page(
+    p_reg_type_id INT DEFAULT NULL,
+    p_year INT DEFAULT NULL,
+    p_status TEXT DEFAULT NULL,
+    p_title_pattern TEXT DEFAULT NULL,
+    p_cursor_year INT DEFAULT NULL,
+    p_cursor_id INT DEFAULT NULL,
+    p_offset INT DEFAULT 0,
+    p_limit INT DEFAULT 20
+)
+RETURNS jsonb
+LANGUAGE sql STABLE
+SET search_path = 'public', 'extensions'
+AS $$
+  WITH filtered AS NOT MATERIALIZED (
+    SELECT w.id, w.frbr_uri, w.title_id, w.number, w.year, w.status, w.regulation_type_id
+    FROM works w
+    WHERE (p_reg_type_id IS NULL OR w.regulation_type_id = p_reg_type_id)
+      AND (p_year IS NULL OR w.year = p_year)
+      AND (p_status IS NULL OR w.status = p_status)
+      AND (p_title_pattern IS NULL OR w.title_id ILIKE p_title_pattern)
+  ),
+  page AS (
+    SELECT f.*
+    FROM filtered f
+    WHERE (f.year, f.id) < (COALESCE(p_cursor_year, 2147483647), COALESCE(p_cursor_id, 2147483647))
+    ORDER BY f.year DESC, f.id DESC
+    OFFSET p_offset
+    LIMIT p_limit
+  )
+  SELECT jsonb_build_object(
+    'total', CASE WHEN p_cursor_year IS NULL THEN (SELECT count(*) FROM filtered) END,
+    'laws', COALESCE((
+      SELECT jsonb_agg(
+        jsonb_build_object(
+          'frbr_uri', p.frbr_uri,
+          'title', p.title_id,
+          'regulation_type', COALESCE(rt.code, ''),
+          'number', p.number,
+          'year', p.year,
+          'status', p.status
+        )
+        ORDER BY p.year DESC, p.id DESC
+      )
+      FROM page p
+      LEFT JOIN regulation_types rt ON rt.id = p.regulation_type_id
+    ), '[]'::jsonb),
+    'next_cursor', (
+      -- Only a full page can have a successor
+      SELECT p.year || ':' || p.id
+      FROM page p
+      WHERE (SELECT count(*) FROM page) = p_limit
+      ORDER BY p.year, p.id
+      LIMIT 1
+    )
+  );
+$$;
@@ -0,0 +1,19 @@
+-- Migration 060: mcp_bootstrap() RPC
+-- The MCP server warmed its regulation type maps at startup and later paid a
+-- separate count(*) on `works` for the law count shown in no-results
+-- messages. This function returns both in one roundtrip so the server starts
+-- with both caches populated.
+
+CREATE OR REPLACE FUNCTION mcp_bootstrap()
+RETURNS jsonb
+LANGUAGE sql STABLE
+SET search_path = 'public', 'extensions'
+AS $$
+  SELECT jsonb_build_object(
+    'regulation_types', COALESCE(
+      (SELECT jsonb_agg(jsonb_build_object('id', rt.id, 'code', rt.code)) FROM regulation_types rt),
+      '[]'::jsonb
+    ),
+    'law_count', (SELECT count(*) FROM works)
+  );
+$$;
@@ -0,0 +1,24 @@
+-- Migration 062: crawl_stats() RPC
+-- get_crawl_stats() in scripts/crawler/dedup.py ran ten COUNT queries (total,
+-- one per status, works). This function returns the same numbers from one
+-- GROUP BY over crawl_jobs (served by idx_crawl_status) plus the works count.
+--
+-- Returns {total_jobs, by_status: {status: count}, total_works}; statuses with
+-- no jobs are absent from by_status.
+
+CREATE OR REPLACE FUNCTION crawl_stats()
+RETURNS jsonb
+LANGUAGE sql STABLE
+SET search_path = 'public', 'extensions'
+AS $$
+  WITH counts AS (
+    SELECT status, count(*) AS n
+    FROM crawl_jobs
+    GROUP BY status
+  )
+  SELECT jsonb_build_object(
+    'total_jobs', COALESCE((SELECT sum(n) FROM counts), 0),
+    'by_status', COALESCE((SELECT jsonb_object_agg(status, n) FROM counts), '{}'::jsonb),
+    'total_works', (SELECT count(*) FROM works)
+  );
+$$;
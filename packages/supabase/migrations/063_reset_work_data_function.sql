@@ -0,0 +1,22 @@
+-- Migration 063: reset_work_data() RPC
+-- cleanup_work_data() in scripts/loader/load_to_supabase.py cleared a work
+-- before reloading its nodes with three DELETE requests (suggestions,
+-- revisions, document_nodes). This function runs the same deletes in one
+-- call and one transaction: either the work is fully cleared or nothing is.
+--
+-- Order matters: suggestions reference revisions and document_nodes without
+-- ON DELETE, and revisions reference document_nodes.
+
+CREATE OR REPLACE FUNCTION reset_work_data(p_work_id INT)
+RETURNS void
+LANGUAGE sql
+SET search_path = 'public', 'extensions'
+AS $$
+  DELETE FROM suggestions WHERE work_id = p_work_id;
+  DELETE FROM revisions WHERE work_id = p_work_id;
+  DELETE FROM document_nodes WHERE work_id = p_work_id;
+$$;
+
+-- Deletes user data: service_role only (same policy as claim_jobs, migration 051)
+REVOKE EXECUTE ON FUNCTION reset_work_data(int) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reset_work_data(int) TO service_role;
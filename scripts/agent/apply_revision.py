@@ -5,14 +5,7 @@ Delegates to the apply_revision() SQL function which performs all steps
 single transaction.
 """
 
-import os
-from pathlib import Path
-
-from dotenv import load_dotenv
-
-load_dotenv(Path(__file__).parent.parent / ".env")
-
-from supabase import create_client
+from agent.pdf_utils import get_supabase
 
 
 def apply_revision(
@@ -26,7 +19,7 @@ def apply_revision(
     created_by: str | None = None,
 ) -> int | None:
     """Apply a revision to a document node. Returns the revision ID or None on failure."""
-    sb = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
+    sb = get_supabase()
 
     try:
         result = sb.rpc("apply_revision", {
@@ -6,9 +6,9 @@ and auto-applies high-confidence corrections via apply_revision().
 """
 
 import asyncio
-import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -34,6 +34,24 @@ from agent.logger import (
 POLL_INTERVAL = int(os.environ.get("POLL_INTERVAL_SECONDS", "30"))
 CONFIDENCE_THRESHOLD = float(os.environ.get("CONFIDENCE_AUTO_APPLY_THRESHOLD", "0.85"))
 MAX_PER_RUN = int(os.environ.get("MAX_SUGGESTIONS_PER_RUN", "5"))
+EXECUTOR_WORKERS = int(os.environ.get("AGENT_EXECUTOR_WORKERS", "32"))
+
+
+def _install_executor() -> None:
+    """Bound the thread pool behind asyncio.to_thread.
+
+    The Supabase, PDF and Anthropic clients used here are synchronous; every
+    call from the async pipeline is offloaded so the event loop never blocks
+    on network I/O.
+    """
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS, thread_name_prefix="agent-io")
+    )
+
+
+def _utcnow_iso() -> str:
+    """Current UTC time as an ISO 8601 string for timestamptz columns."""
+    return datetime.now(timezone.utc).isoformat()
 
 
 def fetch_pending_suggestions(limit: int = 5) -> list[dict]:
@@ -41,7 +59,10 @@ def fetch_pending_suggestions(limit: int = 5) -> list[dict]:
     sb = get_supabase()
     result = (
         sb.table("suggestions")
-        .select("*")
+        .select(
+            "id, work_id, node_id, current_content, suggested_content,"
+            " user_reason, created_at"
+        )
         .eq("status", "pending")
         .is_("agent_triggered_at", "null")
         .order("created_at")
@@ -51,59 +72,81 @@ def fetch_pending_suggestions(limit: int = 5) -> list[dict]:
     return result.data or []
 
 
-async def process_suggestion(suggestion: dict) -> dict | None:
+async def _fetch_work(sb, work_id: int, work_cache: dict[int, dict | None]) -> dict | None:
+    """Fetch a work row, reusing rows already fetched earlier in the batch."""
+    if work_id not in work_cache:
+        resp = await asyncio.to_thread(
+            sb.table("works")
+            .select("id, title_id, slug, source_pdf_url, number, year")
+            .eq("id", work_id)
+            .single()
+            .execute
+        )
+        work_cache[work_id] = resp.data
+    return work_cache[work_id]
+
+
+async def process_suggestion(
+    suggestion: dict, work_cache: dict[int, dict | None] | None = None
+) -> dict | None:
     """Process a single suggestion through the Opus 4.6 verification pipeline.
 
-    Returns the verification result dict, or None if skipped.
+    ``work_cache`` lets a batch share work rows between suggestions on the
+    same law. Returns the verification result dict, or None if skipped.
     """
     t0 = time.monotonic()
     sb = get_supabase()
     suggestion_id = suggestion["id"]
 
     # ── Step A: Claim the job (optimistic lock) ──────────────────────
-    now_iso = datetime.now(timezone.utc).isoformat()
-    claim = (
+    now_iso = _utcnow_iso()
+    claim = await asyncio.to_thread(
         sb.table("suggestions")
         .update({"agent_triggered_at": now_iso})
         .eq("id", suggestion_id)
         .is_("agent_triggered_at", "null")
-        .execute()
+        .execute
     )
     if not claim.data:
         print(f"  SKIP: suggestion {suggestion_id} already claimed", flush=True)
         return None
 
-    # ── Step B: Fetch node + work ────────────────────────────────────
-    node_resp = (
-        sb.table("document_nodes")
-        .select("id, node_type, number, heading, content_text, sort_order, work_id")
-        .eq("id", suggestion["node_id"])
-        .single()
-        .execute()
+    # ── Step B: Fetch node + work (independent, so fetched concurrently) ──
+    node_resp, work = await asyncio.gather(
+        asyncio.to_thread(
+            sb.table("document_nodes")
+            .select("id, node_type, number, heading, content_text, sort_order, work_id")
+            .eq("id", suggestion["node_id"])
+            .single()
+            .execute
+        ),
+        _fetch_work(sb, suggestion["work_id"], {} if work_cache is None else work_cache),
     )
     node = node_resp.data
     if not node:
         print(f"  SKIP: node {suggestion['node_id']} not found", flush=True)
         return None
 
-    work_resp = (
-        sb.table("works")
-        .select("id, title_id, slug, source_pdf_url, number, year")
-        .eq("id", suggestion["work_id"])
-        .single()
-        .execute()
-    )
-    work = work_resp.data
     if not work:
         print(f"  SKIP: work {suggestion['work_id']} not found", flush=True)
         return None
 
     log_suggestion_header(suggestion, work, node)
 
+    # The PDF page search only needs node + work, so it runs while Step 1
+    # queries the siblings
+    slug = work.get("slug", "")
+    node_number = node.get("number", "")
+    node_content = node.get("content_text", "")
+    page_task = (
+        asyncio.create_task(asyncio.to_thread(find_page_for_node, slug, node_number, node_content))
+        if slug else None
+    )
+
     # ── Step 1: Gather sibling context ───────────────────────────────
     with StepTimer(1, 4, "Gathering context...") as step1:
         sort_order = node.get("sort_order") or 0
-        siblings_resp = (
+        siblings_resp = await asyncio.to_thread(
             sb.table("document_nodes")
             .select("node_type, number, heading, content_text, sort_order")
             .eq("work_id", node["work_id"])
@@ -112,37 +155,29 @@ async def process_suggestion(suggestion: dict) -> dict | None:
             .lte("sort_order", sort_order + 3)
             .order("sort_order")
             .limit(7)
-            .execute()
+            .execute
         )
         siblings = siblings_resp.data or []
         step1.detail(f"Found {len(siblings)} sibling nodes")
 
-        surrounding_context = ""
-        if siblings:
-            parts = []
-            for s in siblings:
-                marker = (
-                    " ← [PASAL YANG DIKOREKSI]"
-                    if s.get("number") == node.get("number")
-                    else ""
-                )
-                text = s.get("content_text") or "(kosong)"
-                truncated = text[:500] + "..." if len(text) > 500 else text
-                parts.append(f"### Pasal {s.get('number', '?')}{marker}\n{truncated}")
-            surrounding_context = "\n\n".join(parts)
+        parts = []
+        for s in siblings:
+            number = s.get("number")
+            marker = " ← [PASAL YANG DIKOREKSI]" if number == node_number else ""
+            text = s.get("content_text") or "(kosong)"
+            if len(text) > 500:
+                text = text[:500] + "..."
+            parts.append(f"### Pasal {number or '?'}{marker}\n{text}")
+        surrounding_context = "\n\n".join(parts)
 
     # ── Step 2: Fetch PDF page image ─────────────────────────────────
     pdf_image: bytes | None = None
     with StepTimer(2, 4, "Fetching PDF source...") as step2:
-        slug = work.get("slug", "")
-        node_number = node.get("number", "")
-        node_content = node.get("content_text", "")
-
-        if slug:
-            page = find_page_for_node(slug, node_number, node_content)
+        if page_task:
+            page = await page_task
             if page:
                 step2.detail(f"Found Pasal {node_number} on page {page}")
-                pdf_image = fetch_pdf_page_image(slug, page)
+                pdf_image = await asyncio.to_thread(fetch_pdf_page_image, slug, page)
                 if pdf_image:
                     step2.detail(f"PDF image: {len(pdf_image):,} bytes")
                 else:
@@ -154,7 +189,8 @@ async def process_suggestion(suggestion: dict) -> dict | None:
 
     # ── Step 3: Opus 4.6 verification ────────────────────────────────
     with StepTimer(3, 4, "Opus 4.6 analyzing...") as step3:
-        result = verify_with_opus(
+        result = await asyncio.to_thread(
+            verify_with_opus,
             current_content=suggestion.get("current_content", ""),
             suggested_content=suggestion.get("suggested_content", ""),
             pdf_page_image=pdf_image,
@@ -166,10 +202,16 @@ async def process_suggestion(suggestion: dict) -> dict | None:
         )
         step3.detail(f"Decision: {result['decision']} ({result['confidence']:.2f})")
 
+    # The page image can be several MB; drop it before the DB writes below so
+    # it isn't held for the rest of the suggestion
+    had_pdf_image = pdf_image is not None
+    del pdf_image
+
     # ── Step E: Store result ─────────────────────────────────────────
-    sb.table("suggestions").update({
+    await asyncio.to_thread(sb.table("suggestions").update({
         "agent_model": result.get("model", "claude-opus-4-6"),
-        "agent_response": json.dumps({
+        # JSONB column — pass the dict so it's stored as an object, not a JSON string
+        "agent_response": {
             "raw": result.get("raw_response", ""),
             "parsed": {
                 "decision": result["decision"],
@@ -181,13 +223,13 @@ async def process_suggestion(suggestion: dict) -> dict | None:
             },
             "context_nodes_count": len(siblings),
             "work_title": work.get("title_id"),
-            "had_pdf_image": pdf_image is not None,
-        }),
+            "had_pdf_image": had_pdf_image,
+        },
         "agent_decision": result["decision"],
         "agent_confidence": result["confidence"],
         "agent_modified_content": result.get("corrected_content"),
-        "agent_completed_at": datetime.now(timezone.utc).isoformat(),
-    }).eq("id", suggestion_id).execute()
+        "agent_completed_at": _utcnow_iso(),
+    }).eq("id", suggestion_id).execute)
 
     log_decision(
         result["decision"],
@@ -205,7 +247,8 @@ async def process_suggestion(suggestion: dict) -> dict | None:
             content_to_apply = (
                 result.get("corrected_content") or suggestion["suggested_content"]
             )
-            revision_id = apply_revision(
+            revision_id = await asyncio.to_thread(
+                apply_revision,
                 node_id=node["id"],
                 work_id=work["id"],
                 new_content=content_to_apply,
@@ -217,19 +260,8 @@ async def process_suggestion(suggestion: dict) -> dict | None:
             )
 
             if revision_id:
-                step4.detail(f"Revision #{revision_id} applied")
-                # Update suggestion status to agent_approved
-                try:
-                    sb.table("suggestions").update({
-                        "status": "agent_approved",
-                    }).eq("id", suggestion_id).execute()
-                    step4.detail("Status → agent_approved")
-                except Exception as e:
-                    # Task 6 migration may not be applied yet
-                    step4.detail(
-                        f"Could not set status to agent_approved: {e} "
-                        "(apply Task 6 migration to enable this)"
-                    )
+                # apply_revision() sets status → agent_approved for actor_type="agent" (migration 061)
+                step4.detail(f"Revision #{revision_id} applied, status → agent_approved")
             else:
                 step4.detail("apply_revision returned None — check logs")
                 log_skipped("Revision failed — manual review needed")
@@ -248,20 +280,22 @@ async def process_suggestion(suggestion: dict) -> dict | None:
 
 async def run_worker() -> None:
     """Run the correction worker in continuous polling mode."""
+    _install_executor()
     log_banner({
         "model": "claude-opus-4-6",
         "threshold": CONFIDENCE_THRESHOLD,
         "poll_interval": POLL_INTERVAL,
         "repo": "ilhamfp/pasal",
-        "started": datetime.now(timezone.utc).isoformat(),
+        "started": _utcnow_iso(),
     })
 
     while True:
-        suggestions = fetch_pending_suggestions(MAX_PER_RUN)
+        suggestions = await asyncio.to_thread(fetch_pending_suggestions, MAX_PER_RUN)
         if suggestions:
             batch_results = []
+            work_cache: dict[int, dict | None] = {}  # per batch: suggestions often share a law
             for s in suggestions:
-                result = await process_suggestion(s)
+                result = await process_suggestion(s, work_cache)
                 if result:
                     batch_results.append(result)
             # Trigger parser analysis if batch produced feedback
@@ -279,19 +313,21 @@ async def run_worker() -> None:
 
 async def run_once() -> None:
     """Process one batch of pending suggestions, then exit."""
+    _install_executor()
     log_banner({
         "model": "claude-opus-4-6",
         "threshold": CONFIDENCE_THRESHOLD,
         "poll_interval": POLL_INTERVAL,
         "repo": "ilhamfp/pasal",
-        "started": datetime.now(timezone.utc).isoformat(),
+        "started": _utcnow_iso(),
     })
 
-    suggestions = fetch_pending_suggestions(MAX_PER_RUN)
+    suggestions = await asyncio.to_thread(fetch_pending_suggestions, MAX_PER_RUN)
     if suggestions:
         batch_results = []
+        work_cache: dict[int, dict | None] = {}  # per batch: suggestions often share a law
         for s in suggestions:
-            result = await process_suggestion(s)
+            result = await process_suggestion(s, work_cache)
             if result:
                 batch_results.append(result)
         # Trigger parser analysis if batch produced feedback
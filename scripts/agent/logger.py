@@ -4,32 +4,43 @@ Outputs Unicode box-drawing + emoji for clean Railway logs.
 No ANSI color codes, no third-party imports — stdlib only.
 """
 
+import sys
 import textwrap
 import time
 from datetime import datetime, timezone
 
 
-# ── Box-drawing helpers ──────────────────────────────────────────────
+# ── Output + box-drawing helpers ─────────────────────────────────────
 
 
-def _single_box(lines: list[str], width: int = 62) -> None:
-    """Print a single-line box (┌─┐│└─┘)."""
+def _emit(*lines: str) -> None:
+    """Write a block of lines to stdout with a single write + flush.
+
+    Railway tails the pipe, so each block is flushed immediately, but a box
+    or header costs one syscall instead of one per line.
+    """
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+
+def _single_box(lines: list[str], width: int = 62) -> list[str]:
+    """Render a single-line box (┌─┐│└─┘)."""
     inner = width - 2
-    print(f"┌{'─' * inner}┐", flush=True)
-    for line in lines:
-        padded = line.ljust(inner)[:inner]
-        print(f"│{padded}│", flush=True)
-    print(f"└{'─' * inner}┘", flush=True)
+    return [
+        f"┌{'─' * inner}┐",
+        *(f"│{line.ljust(inner)[:inner]}│" for line in lines),
+        f"└{'─' * inner}┘",
+    ]
 
 
-def _double_box(lines: list[str], width: int = 62) -> None:
-    """Print a double-line box (╔═╗║╚═╝)."""
+def _double_box(lines: list[str], width: int = 62) -> list[str]:
+    """Render a double-line box (╔═╗║╚═╝)."""
     inner = width - 2
-    print(f"╔{'═' * inner}╗", flush=True)
-    for line in lines:
-        padded = line.ljust(inner)[:inner]
-        print(f"║{padded}║", flush=True)
-    print(f"╚{'═' * inner}╝", flush=True)
+    return [
+        f"╔{'═' * inner}╗",
+        *(f"║{line.ljust(inner)[:inner]}║" for line in lines),
+        f"╚{'═' * inner}╝",
+    ]
 
 
 def _now_iso() -> str:
@@ -56,16 +67,14 @@ def log_banner(config: dict) -> None:
         f"  Started:        {config.get('started', _now_iso())}",
         "",
     ]
-    _single_box(lines)
-    print(flush=True)
+    _emit(*_single_box(lines), "")
 
 
 def log_poll_idle(poll_interval: int = 30) -> None:
     """One-liner for idle polling."""
-    print(
+    _emit(
         f"[{_now_iso()}] Polling... no pending suggestions. "
-        f"Next check in {poll_interval}s.",
-        flush=True,
+        f"Next check in {poll_interval}s."
     )
 
 
@@ -80,17 +89,15 @@ def log_suggestion_header(suggestion: dict, work: dict, node: dict) -> None:
         "  CORRECTION AGENT — New Suggestion Detected",
         "",
     ]
-    _double_box(lines)
-
-    # Metadata tree
-    print(f"  ├─ Law:       {work.get('title_id', '(unknown)')}", flush=True)
-    print(f"  ├─ Article:   Pasal {node.get('number', '?')}", flush=True)
-    print(
+    _emit(
+        *_double_box(lines),
+        # Metadata tree
+        f"  ├─ Law:       {work.get('title_id', '(unknown)')}",
+        f"  ├─ Article:   Pasal {node.get('number', '?')}",
         f"  ├─ Submitted: {suggestion.get('created_at', '?')}",
-        flush=True,
+        f"  └─ Reason:    {reason or '(tidak diberikan)'}",
+        "",
     )
-    print(f"  └─ Reason:    {reason or '(tidak diberikan)'}", flush=True)
-    print(flush=True)
 
 
 def log_decision(
@@ -123,20 +130,17 @@ def log_decision(
         *quoted,
         "",
     ]
-    _single_box(lines, width=51)
-    print(flush=True)
+    _emit(*_single_box(lines, width=51), "")
 
 
 def log_skipped(reason: str) -> None:
     """Log a skipped auto-apply."""
-    print(f"  📝 {reason}", flush=True)
+    _emit(f"  📝 {reason}")
 
 
 def log_total_time(seconds: float) -> None:
     """Log total processing time + separator."""
-    print(f"  ⏱️  Total: {seconds:.1f}s", flush=True)
-    print("─" * 62, flush=True)
-    print(flush=True)
+    _emit(f"  ⏱️  Total: {seconds:.1f}s", "─" * 62, "")
 
 
 def log_parser_analysis_header() -> None:
@@ -146,8 +150,7 @@ def log_parser_analysis_header() -> None:
         "  PARSER ANALYSIS — Checking for Systematic Issues",
         "",
     ]
-    _double_box(lines)
-    print(flush=True)
+    _emit(*_double_box(lines), "")
 
 
 def log_parser_analysis_result(
@@ -163,9 +166,7 @@ def log_parser_analysis_result(
         f"  Issues created:    {len(issues)}",
         "",
     ]
-    _single_box(lines)
-    print("═" * 62, flush=True)
-    print(flush=True)
+    _emit(*_single_box(lines), "═" * 62, "")
 
 
 # ── StepTimer ────────────────────────────────────────────────────────
@@ -185,16 +186,13 @@ class StepTimer:
 
     def detail(self, msg: str) -> None:
         """Print an indented detail line."""
-        print(f"     ├─ {msg}", flush=True)
+        _emit(f"     ├─ {msg}")
 
     def __enter__(self) -> "StepTimer":
         self._start = time.monotonic()
-        print(
-            f"\n  {self.emoji} Step {self.step_num}/{self.total} — {self.label}",
-            flush=True,
-        )
+        _emit(f"\n  {self.emoji} Step {self.step_num}/{self.total} — {self.label}")
         return self
 
     def __exit__(self, *args: object) -> None:
         elapsed = time.monotonic() - self._start
-        print(f"     └─ Done ({elapsed:.1f}s)", flush=True)
+        _emit(f"     └─ Done ({elapsed:.1f}s)")
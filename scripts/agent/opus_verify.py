@@ -18,6 +18,7 @@ Output schema:
 import base64
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -55,6 +56,40 @@ PENTING: Selalu isi additional_issues dan parser_feedback."""
 VALID_DECISIONS = {"accept", "accept_with_corrections", "reject"}
 
 
+@lru_cache(maxsize=1)
+def _get_client():
+    """Return the shared Anthropic client, created on first use.
+
+    The client is thread-safe, so the worker's to_thread calls share its
+    connection pool instead of opening a new one per suggestion.
+    """
+    import anthropic
+
+    return anthropic.Anthropic(api_key=os.environ["ANTHROPIC_CORRECTION_AGENT_KEY"])
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def extract_json(text: str) -> dict:
+    """Parse the JSON object in a model reply.
+
+    Decodes from the first ``{`` that starts a valid object, so markdown
+    fences and any prose around the object are skipped without splitting
+    the string. Raises ValueError if the reply contains no JSON object.
+    """
+    start = text.find("{")
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+        except json.JSONDecodeError:
+            obj = None
+        if isinstance(obj, dict):
+            return obj
+        start = text.find("{", start + 1)
+    raise ValueError("No JSON object in model response")
+
+
 def verify_with_opus(
     current_content: str,
     suggested_content: str,
@@ -81,11 +116,7 @@ def verify_with_opus(
     additional_issues, parser_feedback, model, raw_response.
     """
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(
-            api_key=os.environ["ANTHROPIC_CORRECTION_AGENT_KEY"],
-        )
+        client = _get_client()
 
         # Build user message content array
         content = []
@@ -147,15 +178,7 @@ Bandingkan dengan teliti terhadap PDF asli (jika tersedia) dan berikan keputusan
 
         # Extract text from response
         raw_text = response.content[0].text
-        text = raw_text.strip()
-
-        # Strip markdown code fences
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0].strip()
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0].strip()
-
-        result = json.loads(text)
+        result = extract_json(raw_text)
 
         # Validate decision
         decision = result.get("decision", "reject")
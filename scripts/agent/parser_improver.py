@@ -9,7 +9,9 @@ import base64
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from pathlib import Path
 
 import httpx
@@ -43,6 +45,24 @@ def _github_headers() -> dict[str, str]:
     return headers
 
 
+@lru_cache(maxsize=1)
+def _github_client() -> httpx.Client:
+    """Return the shared GitHub API client, created on first use.
+
+    One keep-alive connection serves the file fetches, the issue search and
+    every issue creation in a run instead of a new TLS handshake per call.
+    Connect failures are retried at the transport level, which is safe for
+    the issue POST because nothing was sent; a dead host fails after 5s
+    instead of the full 15s read timeout.
+    """
+    return httpx.Client(
+        base_url=GITHUB_API,
+        headers=_github_headers(),
+        timeout=httpx.Timeout(15.0, connect=5.0),
+        transport=httpx.HTTPTransport(retries=2),
+    )
+
+
 def collect_parser_feedback(since_hours: int = 24) -> list[dict]:
     """Collect parser feedback from recent accepted suggestions.
 
@@ -108,25 +128,32 @@ def collect_parser_feedback(since_hours: int = 24) -> list[dict]:
 def fetch_parser_files() -> dict[str, str]:
     """Fetch parser source files from GitHub.
 
+    The files are independent, so they are fetched concurrently over the
+    shared client.
+
     Returns dict mapping filename to source code string.
     """
-    headers = _github_headers()
-    files = {}
+    client = _github_client()
 
-    for path in PARSER_FILES:
-        url = f"{GITHUB_API}/repos/{GITHUB_REPO}/contents/{path}"
+    def _fetch(path: str) -> str | None:
+        url = f"/repos/{GITHUB_REPO}/contents/{path}"
         try:
-            resp = httpx.get(url, headers=headers, timeout=15)
+            resp = client.get(url)
             resp.raise_for_status()
-            data = resp.json()
-            content_b64 = data.get("content", "")
-            source = base64.b64decode(content_b64).decode("utf-8")
-            filename = path.split("/")[-1]
-            files[filename] = source
+            content_b64 = resp.json().get("content", "")
+            return base64.b64decode(content_b64).decode("utf-8")
         except Exception as e:
             print(f"  Warning: Could not fetch {path}: {e}", flush=True)
+            return None
 
-    return files
+    with ThreadPoolExecutor(max_workers=len(PARSER_FILES)) as pool:
+        sources = list(pool.map(_fetch, PARSER_FILES))
+
+    return {
+        path.split("/")[-1]: source
+        for path, source in zip(PARSER_FILES, sources)
+        if source is not None
+    }
 
 
 def search_existing_issues() -> list[dict]:
@@ -134,14 +161,13 @@ def search_existing_issues() -> list[dict]:
 
     Returns list of {title, number, url}.
     """
-    headers = _github_headers()
     url = (
-        f"{GITHUB_API}/repos/{GITHUB_REPO}/issues"
+        f"/repos/{GITHUB_REPO}/issues"
         f"?labels=parser-improvement&state=open&per_page=50"
     )
 
     try:
-        resp = httpx.get(url, headers=headers, timeout=15)
+        resp = _github_client().get(url)
         resp.raise_for_status()
         return [
             {
@@ -363,19 +389,19 @@ def create_github_issue(
         print(f"  Skipping issue creation (no GITHUB_TOKEN): {title}", flush=True)
         return None
 
-    headers = _github_headers()
-    url = f"{GITHUB_API}/repos/{GITHUB_REPO}/issues"
+    client = _github_client()
+    url = f"/repos/{GITHUB_REPO}/issues"
     payload: dict = {"title": title, "body": body}
     if labels:
         payload["labels"] = labels
 
     try:
-        resp = httpx.post(url, headers=headers, json=payload, timeout=15)
+        resp = client.post(url, json=payload)
 
         # Retry without labels on 422 (labels may not exist)
         if resp.status_code == 422 and labels:
             payload.pop("labels", None)
-            resp = httpx.post(url, headers=headers, json=payload, timeout=15)
+            resp = client.post(url, json=payload)
 
         resp.raise_for_status()
         data = resp.json()
@@ -5,13 +5,14 @@ for vision-based verification of parsed text.
 """
 
 import os
+import threading
 from pathlib import Path
 
 from dotenv import load_dotenv
 
 load_dotenv(Path(__file__).parent.parent / ".env")
 
-from supabase import create_client
+from supabase import Client, create_client
 
 STORAGE_BUCKET = "regulation-pdfs"
 
@@ -19,9 +20,22 @@ STORAGE_BUCKET = "regulation-pdfs"
 _pdf_cache: dict[str, bytes] = {}
 
 
-def get_supabase():
-    """Create a fresh Supabase client."""
-    return create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
+_sb: Client | None = None
+_sb_lock = threading.Lock()
+
+
+def get_supabase() -> Client:
+    """Return a lazily-initialized Supabase client singleton.
+
+    Shared by the worker's asyncio.to_thread calls, so they reuse one HTTP
+    connection pool instead of opening a new TLS session per call.
+    """
+    global _sb
+    if _sb is None:
+        with _sb_lock:
+            if _sb is None:
+                _sb = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
+    return _sb
 
 
 def _get_pdf_bytes(slug: str) -> bytes | None:
@@ -13,13 +13,25 @@ Output schema:
 - additional_issues: other problems found in surrounding text
 - parser_feedback: notes for improving the parser
 """
+import hashlib
 import json
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent.parent / ".env")
 
+from agent.opus_verify import extract_json
+
+GEMINI_MODEL = "gemini-3-flash-preview"
+
+# Bump when SYSTEM_PROMPT or the user prompt template changes, so cached
+# verdicts from the old prompt are not reused
+PROMPT_VERSION = "v1"
 
 SYSTEM_PROMPT = """Anda adalah agen verifikasi teks hukum Indonesia.
 Tugas Anda adalah membandingkan teks hukum hasil parsing PDF dengan koreksi yang disarankan pengguna.
@@ -50,6 +62,28 @@ PENTING: Selalu isi additional_issues dan parser_feedback."""
 VALID_DECISIONS = {"accept", "accept_with_corrections", "reject"}
 
 
+@lru_cache(maxsize=1)
+def _get_client():
+    """Return the shared Gemini client, created on first use.
+
+    Raises KeyError if GEMINI_API_KEY is unset (surfaced as an error result).
+    """
+    from google import genai
+
+    return genai.Client(api_key=os.environ["GEMINI_API_KEY"])
+
+
+# In-process LRU of successful verdicts, keyed by a hash of the prompt inputs
+_RESULT_CACHE_MAX = 256
+_result_cache: OrderedDict[str, dict] = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def _cache_key(*inputs: str) -> str:
+    payload = json.dumps([PROMPT_VERSION, GEMINI_MODEL, *inputs], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
 def verify_suggestion(
     current_content: str,
     suggested_content: str,
@@ -71,12 +105,23 @@ def verify_suggestion(
         work_title: Title of the regulation
 
     Returns dict with decision, confidence, reasoning, corrected_content,
-    additional_issues, parser_feedback.
+    additional_issues, parser_feedback. Identical inputs are answered from
+    an in-process cache; errors are never cached.
     """
+    key = _cache_key(
+        current_content, suggested_content, node_type, node_number,
+        user_reason, surrounding_context, work_title,
+    )
+    with _result_cache_lock:
+        cached = _result_cache.get(key)
+        if cached is not None:
+            _result_cache.move_to_end(key)
+            return dict(cached)
+
     try:
         from google import genai
 
-        client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+        client = _get_client()
 
         prompt = f"""Verifikasi koreksi berikut:
 
@@ -104,7 +149,7 @@ def verify_suggestion(
 Bandingkan dan berikan keputusan verifikasi dalam format JSON."""
 
         response = client.models.generate_content(
-            model="gemini-3-flash-preview",
+            model=GEMINI_MODEL,
             contents=prompt,
             config=genai.types.GenerateContentConfig(
                 system_instruction=SYSTEM_PROMPT,
@@ -113,29 +158,28 @@ Bandingkan dan berikan keputusan verifikasi dalam format JSON."""
             ),
         )
 
-        text = response.text.strip()
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0].strip()
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0].strip()
-
-        result = json.loads(text)
+        result = extract_json(response.text)
         # Validate decision is in allowed set
         decision = result.get("decision", "reject")
         if decision not in VALID_DECISIONS:
             decision = "reject"
         # Clamp confidence to 0-1
         confidence = max(0.0, min(1.0, float(result.get("confidence", 0.5))))
-        return {
+        verdict = {
             "decision": decision,
             "confidence": confidence,
             "reasoning": result.get("reasoning", ""),
             "corrected_content": result.get("corrected_content"),
             "additional_issues": result.get("additional_issues", []),
             "parser_feedback": result.get("parser_feedback", ""),
-            "model": "gemini-3-flash-preview",
+            "model": GEMINI_MODEL,
             "raw_response": response.text,
         }
+        with _result_cache_lock:
+            _result_cache[key] = verdict
+            if len(_result_cache) > _RESULT_CACHE_MAX:
+                _result_cache.popitem(last=False)
+        return dict(verdict)
 
     except Exception as e:
         return {
@@ -145,6 +189,20 @@ Bandingkan dan berikan keputusan verifikasi dalam format JSON."""
             "corrected_content": None,
             "additional_issues": [],
             "parser_feedback": "",
-            "model": "gemini-3-flash-preview",
+            "model": GEMINI_MODEL,
             "error": str(e),
         }
+
+
+def verify_suggestions_batch(items: list[dict], max_workers: int = 8) -> list[dict]:
+    """Verify several suggestions concurrently.
+
+    Each item holds verify_suggestion() keyword arguments. Results come back
+    in input order; a failed item yields its own error result without
+    affecting the others. The shared client is thread-safe, so requests run
+    in parallel over one connection pool.
+    """
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(lambda item: verify_suggestion(**item), items))
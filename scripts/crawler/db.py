@@ -1,5 +1,6 @@
 """Shared Supabase client for crawler modules."""
 import os
+import threading
 
 from supabase import Client, create_client
 
@@ -10,11 +11,18 @@ except Exception:
     pass
 
 _sb: Client | None = None
+_sb_lock = threading.Lock()
 
 
 def get_sb() -> Client:
-    """Return a lazily-initialized Supabase client singleton."""
+    """Return a lazily-initialized Supabase client singleton.
+
+    The pipeline calls into crawler.state from worker threads, so creation is
+    locked to keep concurrent first calls from building separate clients.
+    """
     global _sb
     if _sb is None:
-        _sb = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
+        with _sb_lock:
+            if _sb is None:
+                _sb = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_KEY"])
     return _sb
@@ -1,4 +1,6 @@
 """Deduplication and visit-tracking for cross-source crawling."""
+import time
+
 from .db import get_sb
 
 
@@ -8,13 +10,33 @@ def build_frbr_uri(reg_type: str, number: str, year: int, prefix: str | None = N
     return f"/akn/id/act/{type_part}/{year}/{number}"
 
 
+# frbr_uri -> (work_id, fetched_at) for works already found. Only hits are
+# kept, since a loader can insert a missing work at any time. Hits expire too:
+# load_to_supabase --force-reload deletes works and the loaders recreate them
+# with new ids.
+_KNOWN_WORKS_TTL = 300.0
+_KNOWN_WORKS_MAX = 4096
+_known_works: dict[str, tuple[int, float]] = {}
+
+
 def is_work_duplicate(frbr_uri: str) -> int | None:
     """Check if a work with this FRBR URI already exists. Returns work_id or None."""
+    hit = _known_works.get(frbr_uri)
+    if hit and time.monotonic() - hit[1] < _KNOWN_WORKS_TTL:
+        return hit[0]
+
     sb = get_sb()
     result = sb.table("works").select("id").eq("frbr_uri", frbr_uri).limit(1).execute()
-    if result.data:
-        return result.data[0]["id"]
-    return None
+    if not result.data:
+        _known_works.pop(frbr_uri, None)
+        return None
+    work_id = result.data[0]["id"]
+    _known_works.pop(frbr_uri, None)
+    if len(_known_works) >= _KNOWN_WORKS_MAX:
+        # Evict the oldest entry (dicts keep insertion order)
+        del _known_works[next(iter(_known_works))]
+    _known_works[frbr_uri] = (work_id, time.monotonic())
+    return work_id
 
 
 def mark_job_duplicate(job_id: int, existing_work_id: int) -> None:
@@ -28,16 +50,16 @@ def mark_job_duplicate(job_id: int, existing_work_id: int) -> None:
 
 
 def get_crawl_stats() -> dict:
-    """Get crawling statistics."""
+    """Get crawling statistics via the crawl_stats() RPC (migration 062)."""
     sb = get_sb()
-    total = sb.table("crawl_jobs").select("id", count="exact").execute()
-    by_status = {}
-    for status in ("pending", "crawling", "downloaded", "parsed", "loaded", "failed", "no_pdf", "needs_ocr"):
-        r = sb.table("crawl_jobs").select("id", count="exact").eq("status", status).execute()
-        by_status[status] = r.count or 0
-    works_count = sb.table("works").select("id", count="exact").execute()
+    data = sb.rpc("crawl_stats", {}).execute().data or {}
+    counts = data.get("by_status") or {}
+    by_status = {
+        status: counts.get(status, 0)
+        for status in ("pending", "crawling", "downloaded", "parsed", "loaded", "failed", "no_pdf", "needs_ocr")
+    }
     return {
-        "total_jobs": total.count or 0,
+        "total_jobs": data.get("total_jobs") or 0,
         "by_status": by_status,
-        "total_works": works_count.count or 0,
+        "total_works": data.get("total_works") or 0,
     }
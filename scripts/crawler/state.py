@@ -1,4 +1,5 @@
 """Crawl job state management via Supabase."""
+import random
 import time
 from datetime import datetime, timedelta, timezone
 
@@ -9,15 +10,19 @@ RETRY_BACKOFF = [1, 3, 7]  # seconds between retries
 
 
 def _retry(fn, description: str = "db call"):
-    """Retry a Supabase call with exponential backoff."""
+    """Retry a Supabase call with exponential backoff.
+
+    Each wait is jittered to 50–150% of its RETRY_BACKOFF step so concurrent
+    workers hitting the same outage don't retry in lockstep.
+    """
     for attempt in range(MAX_RETRIES):
         try:
             return fn()
         except Exception as e:
             if attempt == MAX_RETRIES - 1:
                 raise
-            wait = RETRY_BACKOFF[attempt]
-            print(f"  RETRY {attempt + 1}/{MAX_RETRIES} ({description}): {e} — waiting {wait}s")
+            wait = RETRY_BACKOFF[attempt] * (0.5 + random.random())
+            print(f"  RETRY {attempt + 1}/{MAX_RETRIES} ({description}): {e} — waiting {wait:.1f}s")
             time.sleep(wait)
 
 
@@ -60,22 +65,35 @@ def get_pending_jobs(
     return result.data or []
 
 
+def _status_update(status: str, error: str | None = None) -> dict:
+    """Build the crawl_jobs UPDATE payload for a status transition."""
+    now = datetime.now(timezone.utc).isoformat()
+    update: dict = {"status": status, "updated_at": now}
+    if error:
+        update["error_message"] = error
+    if status == "crawling":
+        update["last_crawled_at"] = now
+    return update
+
+
 def update_status(job_id: int, status: str, error: str | None = None) -> None:
     """Update the status of a crawl job."""
     def _do():
         sb = get_sb()
-        update: dict = {
-            "status": status,
-            "updated_at": datetime.now(timezone.utc).isoformat(),
-        }
-        if error:
-            update["error_message"] = error
-        if status == "crawling":
-            update["last_crawled_at"] = datetime.now(timezone.utc).isoformat()
-        sb.table("crawl_jobs").update(update).eq("id", job_id).execute()
+        sb.table("crawl_jobs").update(_status_update(status, error)).eq("id", job_id).execute()
     _retry(_do, f"update_status job={job_id} status={status}")
 
 
+def update_status_bulk(job_ids: list[int], status: str, error: str | None = None) -> None:
+    """Move several crawl jobs to the same status in one UPDATE."""
+    if not job_ids:
+        return
+    def _do():
+        sb = get_sb()
+        sb.table("crawl_jobs").update(_status_update(status, error)).in_("id", job_ids).execute()
+    _retry(_do, f"update_status_bulk jobs={len(job_ids)} status={status}")
+
+
 def is_url_visited(source_id: str, url: str) -> bool:
     """Check if a URL has already been crawled for a given source."""
     sb = get_sb()
@@ -93,9 +111,19 @@ def is_url_visited(source_id: str, url: str) -> bool:
 
 # --- Discovery progress helpers ---
 
+# Process-local copy of discovery_progress rows: (source_id, type) -> (row, fetched_at).
+# Rows only change through upsert_discovery_progress(), which drops the entry.
+_PROGRESS_TTL = 60.0
+_progress_cache: dict[tuple[str, str], tuple[dict | None, float]] = {}
+
 
 def get_discovery_progress(source_id: str, regulation_type: str) -> dict | None:
     """Fetch cached discovery progress for a source + type pair."""
+    key = (source_id, regulation_type)
+    hit = _progress_cache.get(key)
+    if hit and time.monotonic() - hit[1] < _PROGRESS_TTL:
+        return hit[0]
+
     sb = get_sb()
     result = (
         sb.table("discovery_progress")
@@ -105,19 +133,23 @@ def get_discovery_progress(source_id: str, regulation_type: str) -> dict | None:
         .limit(1)
         .execute()
     )
-    return result.data[0] if result.data else None
+    row = result.data[0] if result.data else None
+    _progress_cache[key] = (row, time.monotonic())
+    return row
 
 
 def upsert_discovery_progress(progress: dict) -> None:
     """Insert or update discovery progress for a source + type pair."""
     def _do():
         sb = get_sb()
-        progress["updated_at"] = datetime.now(timezone.utc).isoformat()
-        progress["last_discovered_at"] = datetime.now(timezone.utc).isoformat()
+        now = datetime.now(timezone.utc).isoformat()
+        progress["updated_at"] = now
+        progress["last_discovered_at"] = now
         sb.table("discovery_progress").upsert(
             progress, on_conflict="source_id,regulation_type"
         ).execute()
     _retry(_do, f"upsert_discovery_progress {progress.get('regulation_type', '?')}")
+    _progress_cache.pop((progress.get("source_id"), progress.get("regulation_type")), None)
 
 
 def is_discovery_fresh(
@@ -19,12 +19,15 @@ from .models import AyatNode, BabNode, LawExtraction, PasalNode
 
 
 def _extract_pasals_from_children(children: list[dict]) -> list[PasalNode]:
-    """Recursively extract PasalNode objects from a list of child nodes.
+    """Extract PasalNode objects, in document order, from a list of child nodes.
 
-    Handles nested Bagian/Paragraf containers that sit between BAB and Pasal.
+    Handles nested Bagian/Paragraf containers that sit between BAB and Pasal,
+    walking them with an explicit stack instead of recursion.
     """
     pasals: list[PasalNode] = []
-    for node in children:
+    stack = children[::-1]
+    while stack:
+        node = stack.pop()
         if node["type"] == "pasal":
             ayat_list = [
                 AyatNode(number=child["number"], content=child.get("content", ""))
@@ -39,7 +42,7 @@ def _extract_pasals_from_children(children: list[dict]) -> list[PasalNode]:
                 )
             )
         elif node["type"] in ("bagian", "paragraf"):
-            pasals.extend(_extract_pasals_from_children(node.get("children", [])))
+            stack.extend(reversed(node.get("children", [])))
     return pasals
 
 
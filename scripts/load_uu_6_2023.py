@@ -39,8 +39,11 @@ def reparse_from_full_text(law: dict) -> list[dict]:
     return nodes
 
 
-def insert_uu6_relationships(sb):
-    """Insert bidirectional relationships between UU 6/2023 and UU 13/2003."""
+def insert_uu6_relationships(sb, uu6_id: int):
+    """Insert bidirectional relationships between UU 6/2023 and UU 13/2003.
+
+    uu6_id is the id load_work() returned, so only UU 13/2003 is looked up.
+    """
     # Fetch relationship type IDs
     rel_result = sb.table("relationship_types").select("id, code").execute()
     rel_map = {r["code"]: r["id"] for r in rel_result.data}
@@ -49,42 +52,43 @@ def insert_uu6_relationships(sb):
         print("  Warning: relationship types 'mengubah' or 'diubah_oleh' not found")
         return 0
 
-    # Fetch work IDs by frbr_uri
     try:
-        uu6 = sb.table("works").select("id").eq("frbr_uri", "/akn/id/act/uu/2023/6").single().execute()
-        uu13 = sb.table("works").select("id").eq("frbr_uri", "/akn/id/act/uu/2003/13").single().execute()
+        uu13 = sb.table("works").select("id").eq("frbr_uri", "/akn/id/act/uu/2003/13").execute()
     except Exception as e:
-        print(f"  Warning: failed to fetch work IDs: {e}")
+        print(f"  Warning: failed to fetch UU 13/2003 work ID: {e}")
         return 0
 
-    if not uu6.data or not uu13.data:
-        print("  Warning: UU 6/2023 or UU 13/2003 not found in database")
+    if not uu13.data:
+        print("  Warning: UU 13/2003 not found in database")
         return 0
+    uu13_id = uu13.data[0]["id"]
 
-    # Upsert bidirectional relationship
+    # Upsert both directions in a single request
     relationships = [
-        (uu6.data["id"], uu13.data["id"], rel_map["mengubah"], "UU 6/2023 mengubah UU 13/2003"),
-        (uu13.data["id"], uu6.data["id"], rel_map["diubah_oleh"], "UU 13/2003 diubah oleh UU 6/2023"),
+        (uu6_id, uu13_id, rel_map["mengubah"], "UU 6/2023 mengubah UU 13/2003"),
+        (uu13_id, uu6_id, rel_map["diubah_oleh"], "UU 13/2003 diubah oleh UU 6/2023"),
     ]
 
-    count = 0
-    for src_id, tgt_id, rel_type_id, desc in relationships:
-        try:
-            sb.table("work_relationships").upsert(
+    try:
+        sb.table("work_relationships").upsert(
+            [
                 {
                     "source_work_id": src_id,
                     "target_work_id": tgt_id,
                     "relationship_type_id": rel_type_id,
                     "notes": desc,
-                },
-                on_conflict="source_work_id,target_work_id,relationship_type_id",
-            ).execute()
-            count += 1
-            print(f"  ✓ {desc}")
-        except Exception as e:
-            print(f"  Error inserting relationship: {e}")
+                }
+                for src_id, tgt_id, rel_type_id, desc in relationships
+            ],
+            on_conflict="source_work_id,target_work_id,relationship_type_id",
+        ).execute()
+    except Exception as e:
+        print(f"  Error inserting relationships: {e}")
+        return 0
 
-    return count
+    for *_, desc in relationships:
+        print(f"  ✓ {desc}")
+    return len(relationships)
 
 
 def main():
@@ -136,7 +140,9 @@ def main():
 
     # 2. Clean existing data (delete suggestions → revisions → document_nodes)
     print("\n--- Cleaning existing data ---")
-    cleanup_work_data(sb, work_id)
+    if not cleanup_work_data(sb, work_id):
+        print("ERROR: Failed to clean existing data")
+        return 1
     print("  Cleaned suggestions, revisions, document_nodes")
 
     # 3. Insert all nodes in breadth-first batches
@@ -146,13 +152,13 @@ def main():
 
     # 4. Insert bidirectional relationships with UU 13/2003
     print("\n--- Inserting relationships ---")
-    rel_count = insert_uu6_relationships(sb)
+    rel_count = insert_uu6_relationships(sb, work_id)
     print(f"  Inserted {rel_count} relationships")
 
     # 5. Verify data integrity
     print("\n--- Verifying data ---")
-    node_count = sb.table("document_nodes").select("id", count="exact").eq("work_id", work_id).execute()
-    pasal_count = sb.table("document_nodes").select("id", count="exact").eq("work_id", work_id).eq("node_type", "pasal").execute()
+    node_count = sb.table("document_nodes").select("id", count="exact", head=True).eq("work_id", work_id).execute()
+    pasal_count = sb.table("document_nodes").select("id", count="exact", head=True).eq("work_id", work_id).eq("node_type", "pasal").execute()
 
     print(f"  Total nodes: {node_count.count}")
     print(f"  Pasal nodes: {pasal_count.count} (was {old_pasal_count})")
@@ -104,39 +104,42 @@ def process_pdf(pdf_path: Path, metadata: dict) -> dict | None:
     }
 
 
-def insert_relationships(sb) -> int:
-    """Insert work_relationships for the 3 UUD works."""
+def insert_relationships(sb, work_ids: dict[str, int]) -> int:
+    """Insert work_relationships for the 3 UUD works.
+
+    work_ids maps frbr_uri to the id load_work() returned, so no works lookup
+    is needed; every relationship is upserted in one request.
+    """
     rel_result = sb.table("relationship_types").select("id, code").execute()
     rel_map = {r["code"]: r["id"] for r in rel_result.data}
 
-    count = 0
+    rows = []
     for source_uri, target_uri, rel_code in UUD_RELATIONSHIPS:
         rel_type_id = rel_map.get(rel_code)
         if not rel_type_id:
             print(f"  Warning: relationship type '{rel_code}' not found")
             continue
-
-        src = sb.table("works").select("id").eq("frbr_uri", source_uri).execute()
-        tgt = sb.table("works").select("id").eq("frbr_uri", target_uri).execute()
-        if not src.data or not tgt.data:
+        if source_uri not in work_ids or target_uri not in work_ids:
             print(f"  Warning: works not found for {source_uri} -> {target_uri}")
             continue
-
-        try:
-            sb.table("work_relationships").upsert(
-                {
-                    "source_work_id": src.data[0]["id"],
-                    "target_work_id": tgt.data[0]["id"],
-                    "relationship_type_id": rel_type_id,
-                    "notes": "UUD 1945 amendment relationship",
-                },
-                on_conflict="source_work_id,target_work_id,relationship_type_id",
-            ).execute()
-            count += 1
-        except Exception as e:
-            print(f"  Error inserting {rel_code}: {e}")
-
-    return count
+        rows.append({
+            "source_work_id": work_ids[source_uri],
+            "target_work_id": work_ids[target_uri],
+            "relationship_type_id": rel_type_id,
+            "notes": "UUD 1945 amendment relationship",
+        })
+
+    if not rows:
+        return 0
+    try:
+        sb.table("work_relationships").upsert(
+            rows,
+            on_conflict="source_work_id,target_work_id,relationship_type_id",
+        ).execute()
+    except Exception as e:
+        print(f"  Error inserting relationships: {e}")
+        return 0
+    return len(rows)
 
 
 def upload_pdfs(sb) -> int:
@@ -207,7 +210,7 @@ def main():
     # Load into DB
     print("\n=== Loading into Supabase ===")
     sb = init_supabase()
-    work_ids = []
+    work_ids: dict[str, int] = {}
 
     for entry, result in results:
         print(f"\nLoading {entry['slug']}...")
@@ -218,19 +221,21 @@ def main():
             continue
 
         # Clean old data and reload
-        cleanup_work_data(sb, work_id)
+        if not cleanup_work_data(sb, work_id):
+            print(f"  FAILED to clean old data")
+            continue
 
         nodes = result.get("nodes", [])
         pasal_nodes = load_nodes_by_level(sb, work_id, nodes)
         print(f"  Inserted {len(pasal_nodes)} content nodes")
 
-        work_ids.append(work_id)
+        work_ids[entry["metadata"]["frbr_uri"]] = work_id
         print(f"  OK: work_id={work_id}")
 
     # Insert relationships
     if len(work_ids) == 3:
         print("\n=== Inserting relationships ===")
-        rel_count = insert_relationships(sb)
+        rel_count = insert_relationships(sb, work_ids)
         print(f"  Inserted {rel_count} relationships")
 
     # Upload PDFs and page images to storage
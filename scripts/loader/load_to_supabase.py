@@ -13,6 +13,7 @@ import argparse
 import json
 import os
 import sys
+from collections import defaultdict
 from pathlib import Path
 
 try:
@@ -220,18 +221,32 @@ def load_nodes_by_level(sb, work_id: int, nodes: list[dict]) -> list[dict]:
     if not flat:
         return []
 
-    # Group by depth
-    max_depth = max(f["depth"] for f in flat)
+    # Group flat-list indices by depth in one pass
+    by_depth: dict[int, list[int]] = defaultdict(list)
+    for i, f in enumerate(flat):
+        by_depth[f["depth"]].append(i)
     # Map flat-list index → inserted DB id
     idx_to_db_id: dict[int, int] = {}
     pasal_nodes: list[dict] = []
 
-    for d in range(max_depth + 1):
+    def _record(flat_idx: int, db_id: int) -> None:
+        idx_to_db_id[flat_idx] = db_id
+        node = flat[flat_idx]["node"]
+        if node["type"] in _CONTENT_NODE_TYPES:
+            pasal_nodes.append({
+                "node_id": db_id,
+                "number": node.get("number", ""),
+                "content": node.get("content", ""),
+                "heading": node.get("heading", ""),
+                "parent_heading": flat[flat_idx]["path"].rpartition(".")[0],
+                "node_type": node["type"],
+            })
+
+    for d in sorted(by_depth):
+        batch_indices = by_depth[d]
         batch = []
-        batch_indices = []
-        for i, f in enumerate(flat):
-            if f["depth"] != d:
-                continue
+        for i in batch_indices:
+            f = flat[i]
             node = f["node"]
             parent_db_id = idx_to_db_id.get(f["parent_idx"]) if f["parent_idx"] is not None else None
             batch.append({
@@ -245,46 +260,20 @@ def load_nodes_by_level(sb, work_id: int, nodes: list[dict]) -> list[dict]:
                 "depth": d,
                 "sort_order": f["sort_order"],
             })
-            batch_indices.append(i)
-
-        if not batch:
-            continue
 
         try:
             result = sb.table("document_nodes").insert(batch).execute()
             if result.data:
-                for j, row in enumerate(result.data):
-                    flat_idx = batch_indices[j]
-                    idx_to_db_id[flat_idx] = row["id"]
-                    node = flat[flat_idx]["node"]
-                    if node["type"] in _CONTENT_NODE_TYPES:
-                        pasal_nodes.append({
-                            "node_id": row["id"],
-                            "number": node.get("number", ""),
-                            "content": node.get("content", ""),
-                            "heading": node.get("heading", ""),
-                            "parent_heading": flat[flat_idx]["path"].rsplit(".", 1)[0] if "." in flat[flat_idx]["path"] else "",
-                            "node_type": node["type"],
-                        })
+                for flat_idx, row in zip(batch_indices, result.data):
+                    _record(flat_idx, row["id"])
         except Exception as e:
             print(f"  ERROR batch-inserting depth {d} ({len(batch)} nodes): {e}")
             # Fallback: insert one by one
-            for j, node_data in enumerate(batch):
+            for flat_idx, node_data in zip(batch_indices, batch):
                 try:
                     result = sb.table("document_nodes").insert(node_data).execute()
                     if result.data:
-                        flat_idx = batch_indices[j]
-                        idx_to_db_id[flat_idx] = result.data[0]["id"]
-                        node = flat[flat_idx]["node"]
-                        if node["type"] in _CONTENT_NODE_TYPES:
-                            pasal_nodes.append({
-                                "node_id": result.data[0]["id"],
-                                "number": node.get("number", ""),
-                                "content": node.get("content", ""),
-                                "heading": node.get("heading", ""),
-                                "parent_heading": flat[flat_idx]["path"].rsplit(".", 1)[0] if "." in flat[flat_idx]["path"] else "",
-                                "node_type": node["type"],
-                            })
+                        _record(flat_idx, result.data[0]["id"])
                 except Exception as e2:
                     print(f"  ERROR inserting node {node_data['node_type']} {node_data['number']}: {e2}")
 
@@ -323,17 +312,20 @@ def render_page_images(sb, pdf_path: Path, slug: str) -> int:
         doc.close()
 
 
-def cleanup_work_data(sb, work_id: int) -> None:
+def cleanup_work_data(sb, work_id: int) -> bool:
     """Delete existing document_nodes for a specific work.
 
-    Order matters: suggestions/revisions reference nodes via FK.
+    Suggestions and revisions go first (they reference nodes via FK); the
+    reset_work_data() RPC (migration 063) runs all three deletes in one
+    transaction. Returns False if the reset RPC failed, in which case callers
+    must not insert nodes on top of the old ones.
     """
-    tables = ["suggestions", "revisions", "document_nodes"]
-    for table in tables:
-        try:
-            sb.table(table).delete().eq("work_id", work_id).execute()
-        except Exception as e:
-            print(f"  Warning: Failed to clean {table} for work {work_id}: {e}")
+    try:
+        sb.rpc("reset_work_data", {"p_work_id": work_id}).execute()
+        return True
+    except Exception as e:
+        print(f"  ERROR: Failed to clean data for work {work_id}: {e}")
+        return False
 
 
 def _load_progress() -> set[str]:
@@ -414,7 +406,10 @@ def main():
                 continue
 
             # 2. Per-work cleanup (idempotent reload)
-            cleanup_work_data(sb, work_id)
+            if not cleanup_work_data(sb, work_id):
+                print("  SKIP: Failed to clean existing data")
+                failed.append(jf.name)
+                continue
 
             total_works += 1
             print(f"  Work ID: {work_id}")
@@ -10,7 +10,7 @@ os.environ.setdefault("SUPABASE_KEY", "fake-key")
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from load_to_supabase import load_work, load_nodes_recursive
+from load_to_supabase import cleanup_work_data, load_work, load_nodes_recursive
 
 _CHAINABLE = ("select", "eq", "neq", "in_", "ilike", "or_", "match",
               "order", "range", "limit", "single", "upsert", "insert", "delete")
@@ -84,6 +84,18 @@ class TestLoadWork:
         assert result is None
 
 
+class TestCleanupWorkData:
+    def test_success_returns_true(self):
+        sb = _sb()
+        assert cleanup_work_data(sb, 7) is True
+        sb.rpc.assert_called_once_with("reset_work_data", {"p_work_id": 7})
+
+    def test_exception_returns_false(self):
+        sb = _sb()
+        sb.rpc.return_value.execute.side_effect = Exception("db error")
+        assert cleanup_work_data(sb, 7) is False
+
+
 class TestLoadNodesRecursive:
     def test_empty_list(self):
         sb = _sb()
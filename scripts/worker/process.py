@@ -302,7 +302,8 @@ def _extract_and_load(
     if not work_id:
         raise ValueError(f"Failed to upsert work for {law['frbr_uri']}")
 
-    cleanup_work_data(sb, work_id)
+    if not cleanup_work_data(sb, work_id):
+        raise ValueError(f"Failed to clean existing data for {law['frbr_uri']}")
     pasal_nodes = load_nodes_by_level(sb, work_id, nodes)
 
     return work_id, len(pasal_nodes)
@@ -33,6 +33,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from worker.discover import REG_TYPES, discover_regulations
 from worker.process import EXTRACTION_VERSION, _create_run, _update_run, process_jobs, reprocess_jobs
 from crawler.db import get_sb
+from crawler.dedup import get_crawl_stats
 
 EMPTY_STATS = {"processed": 0, "succeeded": 0, "failed": 0}
 
@@ -304,16 +305,15 @@ def cmd_stats(args: argparse.Namespace) -> None:
     """Show current scraper stats."""
     sb = get_sb()
 
-    # Job counts by status
+    # Job counts by status and total works, from one crawl_stats() call
+    stats = get_crawl_stats()
     print("=== CRAWL JOB STATS ===")
-    for status in ["pending", "crawling", "downloaded", "parsed", "loaded", "failed", "no_pdf", "needs_ocr"]:
-        result = sb.table("crawl_jobs").select("id", count="exact").eq("status", status).execute()
-        print(f"  {status:>12}: {result.count or 0}")
-
-    # Total works and searchable nodes
-    works = sb.table("works").select("id", count="exact").execute()
-    nodes = sb.table("document_nodes").select("id", count="exact").in_("node_type", ["pasal","ayat","preamble","content","aturan","penjelasan_umum","penjelasan_pasal"]).execute()
-    print(f"\n  Total works: {works.count or 0}")
+    for status, count in stats["by_status"].items():
+        print(f"  {status:>12}: {count}")
+
+    # Searchable nodes (count only, no rows)
+    nodes = sb.table("document_nodes").select("id", count="exact", head=True).in_("node_type", ["pasal","ayat","preamble","content","aturan","penjelasan_umum","penjelasan_pasal"]).execute()
+    print(f"\n  Total works: {stats['total_works']}")
     print(f"  Searchable nodes: {nodes.count or 0}")
 
     # Recent runs